@@ -4,53 +4,74 @@ Analytics API Routes
 Provides dashboard statistics, risk trends, and insights
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Request, Query
+from operator import itemgetter
+from typing import AsyncIterator, List
+import orjson
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.core.cache import cached
 from app.core.database import get_collection
-from app.middleware.auth import get_current_user
+from app.middleware.auth import get_current_uid
+from app.services.analytics_summary import get_user_summary
 from app.services.groq_service import generate_batch_recommendations
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["analytics"],
+    default_response_class=ORJSONResponse,
+)
 
+# Seconds a per-user analytics response is served from cache (dashboard polling)
+ANALYTICS_CACHE_TTL = 30
+
+# Lower bound of the first risk trend bucket (before any asset discovery)
+TREND_EPOCH = datetime(1970, 1, 1)
+
+# Maximum insights sent to the LLM for recommendations, highest priority first
+MAX_RECOMMENDED_INSIGHTS = 6
+
+# Maximum points generated when the trend is filled in (limit for performance)
+TREND_FILL_DAYS = 30
+
+# Insight priorities as integer sort keys
+P_CRIT, P_HIGH, P_MED, P_LOW = 0, 1, 2, 3
+
+# Display fields returned for top risky assets (skips raw scan/misconfiguration data)
+TOP_RISKY_ASSET_PROJECTION = {
+    "_id": 0,
+    "asset_id": 1,
+    "asset_value": 1,
+    "asset_type": 1,
+    "risk_score": 1,
+    "risk_level": 1,
+    "open_ports": 1,
+    "http_status": 1,
+    "discovered_at": 1,
+    "last_scanned_at": 1,
+}
+
+# Top risky assets fetched before the streamed response starts
+TOP_RISKY_FIRST_BATCH = 10
 
 @router.get("/dashboard")
-async def get_dashboard_stats(request: Request):
+async def get_dashboard_stats(uid: str = Depends(get_current_uid)):
     """
     Get dashboard overview statistics.
 
     Returns key metrics for dashboard cards.
     """
-    user = get_current_user(request)
-    uid = user["uid"]
+    async def compute() -> dict:
+        summary = await get_user_summary(uid)
 
-    try:
-        assets_collection = get_collection("assets")
-        scans_collection = get_collection("scans")
-
-        # Count total assets
-        total_assets = await assets_collection.count_documents({"user_id": uid})
-
-        # Count assets by risk level
-        assets_by_risk = {
-            "low": await assets_collection.count_documents({"user_id": uid, "risk_level": "low"}),
-            "medium": await assets_collection.count_documents({"user_id": uid, "risk_level": "medium"}),
-            "high": await assets_collection.count_documents({"user_id": uid, "risk_level": "high"}),
-            "critical": await assets_collection.count_documents({"user_id": uid, "risk_level": "critical"}),
-        }
-
-        # Count total scans
-        total_scans = await scans_collection.count_documents({"user_id": uid})
-
-        # Calculate overall risk score (average)
-        pipeline = [
-            {"$match": {"user_id": uid}},
-            {"$group": {"_id": None, "avg_risk": {"$avg": "$risk_score"}}}
-        ]
-        result = await assets_collection.aggregate(pipeline).to_list(length=1)
-        overall_risk_score = int(result[0]["avg_risk"]) if result else 0
+        total_assets = summary["total_assets"]
+        total_scans = summary["total_scans"]
+        current_avg_risk = summary["avg_risk"]
+        overall_risk_score = int(current_avg_risk)
 
         # Determine overall risk level
         if overall_risk_score >= 86:
@@ -62,67 +83,30 @@ async def get_dashboard_stats(request: Request):
         else:
             overall_risk_level = "low"
 
-        # Calculate 7-day changes using historical data
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        fourteen_days_ago = datetime.utcnow() - timedelta(days=14)
-        
-        # Calculate risk score change (compare current avg vs 7 days ago)
-        current_avg_pipeline = [
-            {"$match": {"user_id": uid}},
-            {"$group": {"_id": None, "avg_risk": {"$avg": "$risk_score"}}}
-        ]
-        current_avg_result = await assets_collection.aggregate(current_avg_pipeline).to_list(length=1)
-        current_avg_risk = current_avg_result[0]["avg_risk"] if current_avg_result and current_avg_result[0].get("avg_risk") else 0
-        
-        # Get assets discovered 7-14 days ago for comparison
-        old_assets_pipeline = [
-            {
-                "$match": {
-                    "user_id": uid,
-                    "discovered_at": {"$gte": fourteen_days_ago, "$lt": seven_days_ago}
-                }
-            },
-            {"$group": {"_id": None, "avg_risk": {"$avg": "$risk_score"}}}
-        ]
-        old_avg_result = await assets_collection.aggregate(old_assets_pipeline).to_list(length=1)
-        old_avg_risk = old_avg_result[0]["avg_risk"] if old_avg_result and old_avg_result[0].get("avg_risk") else current_avg_risk
-        
+        # Compare current average against assets discovered 7-14 days ago
+        old_avg_risk = summary["old_avg_risk"] or current_avg_risk
+
         # Calculate change percentage
         if old_avg_risk > 0:
             risk_score_change_7d = round(((current_avg_risk - old_avg_risk) / old_avg_risk) * 100, 1)
         else:
             risk_score_change_7d = 0.0
-        
+
         # Calculate assets change (new assets in last 7 days)
-        assets_7d_ago = await assets_collection.count_documents({
-            "user_id": uid,
-            "discovered_at": {"$lt": seven_days_ago}
-        })
+        assets_7d_ago = summary["assets_7d_ago"]
         assets_change_7d = round(((total_assets - assets_7d_ago) / max(assets_7d_ago, 1)) * 100, 1) if assets_7d_ago > 0 else (total_assets * 100.0)
-        
+
         # Calculate scans change (scans in last 7 days vs previous 7 days)
-        scans_7d_ago = await scans_collection.count_documents({
-            "user_id": uid,
-            "created_at": {"$lt": seven_days_ago}
-        })
-        scans_previous_7d = await scans_collection.count_documents({
-            "user_id": uid,
-            "created_at": {"$gte": fourteen_days_ago, "$lt": seven_days_ago}
-        })
+        scans_7d_ago = summary["scans_7d_ago"]
+        scans_previous_7d = summary["scans_previous_7d"]
         if scans_previous_7d > 0:
             scans_change_7d = round(((total_scans - scans_7d_ago - scans_previous_7d) / scans_previous_7d) * 100, 1)
         else:
             scans_change_7d = (total_scans - scans_7d_ago) * 100.0 if (total_scans - scans_7d_ago) > 0 else 0.0
 
-        # Count new critical alerts (last 7 days)
-        new_critical_alerts = await assets_collection.count_documents({
-            "user_id": uid,
-            "risk_level": "critical",
-            "discovered_at": {"$gte": seven_days_ago}
-        })
-
-        # Count open vulnerabilities (high + critical)
-        open_vulnerabilities = assets_by_risk["high"] + assets_by_risk["critical"]
+        new_critical_alerts = summary["new_critical_7d"]
+        open_vulnerabilities = summary["open_vulnerabilities"]
+        assets_by_risk = summary["assets_by_risk"]
 
         return {
             "data": {
@@ -139,6 +123,9 @@ async def get_dashboard_stats(request: Request):
             }
         }
 
+    try:
+        return await cached(f"{uid}:dashboard", ANALYTICS_CACHE_TTL, compute)
+
     except Exception as e:
         logger.error(f"Failed to get dashboard stats: {str(e)}")
         return {
@@ -154,9 +141,27 @@ async def get_dashboard_stats(request: Request):
         }
 
 
+def _fill_dates(now: datetime, days: int) -> List[str]:
+    """
+    Build the date strings for a filled-in risk trend, oldest first.
+
+    Args:
+        now: Reference time shared by the request
+        days: Number of days requested (capped at TREND_FILL_DAYS)
+
+    Returns:
+        List of YYYY-MM-DD strings ending at now
+    """
+    fill_days = min(days, TREND_FILL_DAYS)
+    return [
+        (now - timedelta(days=fill_days - 1 - i)).strftime("%Y-%m-%d")
+        for i in range(fill_days)
+    ]
+
+
 @router.get("/risk-trend")
 async def get_risk_trend(
-    request: Request,
+    uid: str = Depends(get_current_uid),
     days: int = Query(30, ge=1, le=90)
 ):
     """
@@ -168,17 +173,20 @@ async def get_risk_trend(
     Returns:
         Daily risk score averages
     """
-    user = get_current_user(request)
-    uid = user["uid"]
-
-    try:
+    async def compute() -> dict:
         assets_collection = get_collection("assets")
         scans_collection = get_collection("scans")
 
+        # Single clock read shared by every date bound in this request
+        now = datetime.utcnow()
+
         # Get scans from last N days
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start_date = now - timedelta(days=days)
 
-        # Method 1: Aggregate by scan completion dates with asset risk scores
+        # Method 1: Aggregate by scan completion dates with asset risk scores.
+        # The raw datetime $match must stay the first stage so the
+        # (user_id, scan_status, completed_at) index bounds the scan; date
+        # formatting only happens in the later $group.
         scan_pipeline = [
             {
                 "$match": {
@@ -187,6 +195,8 @@ async def get_risk_trend(
                     "completed_at": {"$gte": start_date}
                 }
             },
+            # Walk the index newest first so $first picks each day's latest scan
+            {"$sort": {"completed_at": -1}},
             {
                 "$group": {
                     "_id": {
@@ -201,75 +211,121 @@ async def get_risk_trend(
             {"$sort": {"_id": 1}}
         ]
 
-        scan_results = await scans_collection.aggregate(scan_pipeline).to_list(length=days)
-        
-        # Get all assets for this user
-        all_assets = await assets_collection.find({"user_id": uid}).to_list(length=None)
-        
+        # Average risk over all assets (missing scores count as 0)
+        risk_avg_group = [
+            {
+                "$group": {
+                    "_id": None,
+                    "avg": {"$avg": {"$ifNull": ["$risk_score", 0]}},
+                    "n": {"$sum": 1}
+                }
+            }
+        ]
+        current_pipeline = [{"$match": {"user_id": uid}}] + risk_avg_group
+
+        # Scan dates and the current average are independent, so fetch them together
+        scan_results, current_result = await asyncio.gather(
+            # A window of N days touches at most N + 1 calendar dates
+            scans_collection.aggregate(scan_pipeline).to_list(length=days + 1),
+            assets_collection.aggregate(current_pipeline).to_list(length=1),
+        )
+        scan_dates = [item for item in scan_results if item.get("scan_date")]
+
+        has_assets = bool(current_result)
+        current_avg_risk = current_result[0]["avg"] if has_assets else 0
+
         trend = []
-        
-        if scan_results and all_assets:
-            # We have completed scans - calculate average risk for each scan date
-            # For each scan date, use assets that existed at that time (discovered_at <= scan_date)
-            for scan_item in scan_results:
-                date_str = scan_item["_id"]
-                scan_date = scan_item.get("scan_date")
-                
-                if scan_date:
-                    # Filter assets that existed before or on this scan date
-                    assets_at_time = [
-                        asset for asset in all_assets
-                        if asset.get("discovered_at") and asset.get("discovered_at") <= scan_date
-                    ]
-                    
-                    if assets_at_time:
-                        avg_risk = sum(asset.get("risk_score", 0) for asset in assets_at_time) / len(assets_at_time)
-                        trend.append({
-                            "date": date_str,
-                            "risk_score": round(avg_risk, 1)
-                        })
-                    else:
-                        # No assets at this time, use current average
-                        avg_risk = sum(asset.get("risk_score", 0) for asset in all_assets) / len(all_assets)
-                        trend.append({
-                            "date": date_str,
-                            "risk_score": round(avg_risk, 1)
-                        })
-        elif all_assets:
-            # No scans yet, but we have assets - show current state
-            avg_risk = sum(asset.get("risk_score", 0) for asset in all_assets) / len(all_assets)
-            
-            # Generate points for the requested days showing current average
-            for i in range(min(days, 30)):  # Limit to 30 days max for performance
-                date = datetime.utcnow() - timedelta(days=(min(days, 30) - 1 - i))
-                date_str = date.strftime("%Y-%m-%d")
+
+        if scan_dates and has_assets:
+            # Bucket assets by the scan interval they were discovered in, so one
+            # pass yields per-interval sums; bounds are shifted 1ms to make each
+            # interval end inclusive (discovered_at <= scan_date). Assets with no
+            # discovered_at fall into "other" and are never counted.
+            boundaries = [TREND_EPOCH] + [
+                item["scan_date"] + timedelta(milliseconds=1) for item in scan_dates
+            ]
+            trend_pipeline = [
+                {"$match": {"user_id": uid}},
+                {
+                    "$bucket": {
+                        "groupBy": "$discovered_at",
+                        "boundaries": boundaries,
+                        "default": "other",
+                        "output": {
+                            "total": {"$sum": {"$ifNull": ["$risk_score", 0]}},
+                            "n": {"$sum": 1}
+                        }
+                    }
+                }
+            ]
+            # At most one row per interval plus the "other" bucket
+            bucket_rows = await assets_collection.aggregate(trend_pipeline).to_list(length=len(boundaries))
+            buckets = {row["_id"]: row for row in bucket_rows}
+
+            # Running totals give the average over all assets that existed at each scan
+            running_total = running_n = 0
+            for lower, scan_item in zip(boundaries, scan_dates):
+                row = buckets.get(lower)
+                if row:
+                    running_total += row["total"]
+                    running_n += row["n"]
+
+                # No assets at this time, use current average
+                avg_risk = running_total / running_n if running_n else current_avg_risk
                 trend.append({
-                    "date": date_str,
+                    "date": scan_item["_id"],
                     "risk_score": round(avg_risk, 1)
                 })
-        
+        elif has_assets:
+            # No scans yet, but we have assets - show current state
+            trend = [
+                {"date": date_str, "risk_score": round(current_avg_risk, 1)}
+                for date_str in _fill_dates(now, days)
+            ]
+
         # If we have very few data points but have assets, fill in the trend
-        if len(trend) == 1 and all_assets:
+        if len(trend) == 1 and has_assets:
             single_point = trend[0]
-            trend = []
-            for i in range(min(days, 30)):
-                date = datetime.utcnow() - timedelta(days=(min(days, 30) - 1 - i))
-                date_str = date.strftime("%Y-%m-%d")
-                trend.append({
-                    "date": date_str,
-                    "risk_score": single_point["risk_score"]
-                })
+            trend = [
+                {"date": date_str, "risk_score": single_point["risk_score"]}
+                for date_str in _fill_dates(now, days)
+            ]
 
         return {"data": {"trend": trend}}
 
+    try:
+        return await cached(f"{uid}:risk-trend:{days}", ANALYTICS_CACHE_TTL, compute)
+
     except Exception as e:
         logger.error(f"Failed to get risk trend: {str(e)}")
         return {"data": {"trend": []}}
 
 
+async def _stream_assets_json(first_batch: list, cursor) -> AsyncIterator[bytes]:
+    """
+    Encode assets as {"data": {"assets": [...]}} chunk by chunk.
+
+    A failure mid-stream propagates so the connection is aborted, rather
+    than closing the array early and passing off a partial list as complete.
+
+    Args:
+        first_batch: Assets already fetched before the response started
+        cursor: Cursor positioned after first_batch
+    """
+    yield b'{"data":{"assets":['
+    first = True
+    for asset in first_batch:
+        yield (b"" if first else b",") + orjson.dumps(asset)
+        first = False
+    async for asset in cursor:
+        yield (b"" if first else b",") + orjson.dumps(asset)
+        first = False
+    yield b"]}}"
+
+
 @router.get("/top-risky-assets")
 async def get_top_risky_assets(
-    request: Request,
+    uid: str = Depends(get_current_uid),
     limit: int = Query(10, ge=1, le=50)
 ):
     """
@@ -281,23 +337,22 @@ async def get_top_risky_assets(
     Returns:
         List of top risky assets
     """
-    user = get_current_user(request)
-    uid = user["uid"]
-
     try:
         assets_collection = get_collection("assets")
 
         cursor = assets_collection.find(
-            {"user_id": uid}
+            {"user_id": uid},
+            projection=TOP_RISKY_ASSET_PROJECTION
         ).sort("risk_score", -1).limit(limit)
 
-        assets = await cursor.to_list(length=limit)
+        # The first batch is fetched up front so query errors are handled
+        # below; the rest is streamed as it arrives
+        first_batch = await cursor.to_list(length=TOP_RISKY_FIRST_BATCH)
 
-        # Remove MongoDB _id
-        for asset in assets:
-            asset.pop("_id", None)
-
-        return {"data": {"assets": assets}}
+        return StreamingResponse(
+            _stream_assets_json(first_batch, cursor),
+            media_type="application/json"
+        )
 
     except Exception as e:
         logger.error(f"Failed to get top risky assets: {str(e)}")
@@ -305,27 +360,22 @@ async def get_top_risky_assets(
 
 
 @router.get("/asset-distribution")
-async def get_asset_distribution(request: Request):
+async def get_asset_distribution(uid: str = Depends(get_current_uid)):
     """
     Get asset distribution by type (domain, subdomain, ip_address).
 
     Returns:
         Asset counts by type for bar chart
     """
-    user = get_current_user(request)
-    uid = user["uid"]
-
-    try:
-        assets_collection = get_collection("assets")
+    async def compute() -> dict:
+        summary = await get_user_summary(uid)
+        asset_types = summary["asset_types"]
 
         # Count assets by type
         distribution = []
-        
+
         for asset_type in ["domain", "subdomain", "ip_address"]:
-            count = await assets_collection.count_documents({
-                "user_id": uid,
-                "asset_type": asset_type
-            })
+            count = asset_types.get(asset_type, 0)
             if count > 0:  # Only include types with assets
                 distribution.append({
                     "type": asset_type.replace("_", " ").title(),
@@ -335,172 +385,34 @@ async def get_asset_distribution(request: Request):
 
         return {"data": {"distribution": distribution}}
 
+    try:
+        return await cached(f"{uid}:asset-distribution", ANALYTICS_CACHE_TTL, compute)
+
     except Exception as e:
         logger.error(f"Failed to get asset distribution: {str(e)}")
         return {"data": {"distribution": []}}
 
 
 @router.get("/risk-factors")
-async def get_risk_factors(request: Request):
+async def get_risk_factors(uid: str = Depends(get_current_uid)):
     """
     Get risk factors analysis - what's causing risk scores.
 
     Returns:
         Percentage of assets affected by each risk factor
     """
-    user = get_current_user(request)
-    uid = user["uid"]
-
-    try:
-        assets_collection = get_collection("assets")
+    async def compute() -> dict:
+        summary = await get_user_summary(uid)
+        total_assets = summary["total_assets"]
 
-        # Get total asset count
-        total_assets = await assets_collection.count_documents({"user_id": uid})
-        
         if total_assets == 0:
             return {"data": {"factors": [], "total_assets": 0}}
 
-        factors = []
-
-        # Count assets with open SSH port (22) - MongoDB checks if value is in array
-        ssh_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "open_ports": {"$in": [22]}  # More explicit array check
-        })
-        if ssh_count > 0:
-            factors.append({
-                "name": "SSH Exposed",
-                "count": ssh_count,
-                "percentage": round((ssh_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with database ports
-        db_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "open_ports": {"$in": [3306, 5432, 27017, 6379]}
-        })
-        if db_count > 0:
-            factors.append({
-                "name": "Database Exposed",
-                "count": db_count,
-                "percentage": round((db_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with outdated software
-        outdated_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "outdated_software_count": {"$gt": 0}
-        })
-        if outdated_count > 0:
-            factors.append({
-                "name": "Outdated Software",
-                "count": outdated_count,
-                "percentage": round((outdated_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with invalid SSL
-        ssl_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "ssl_cert_valid": False
-        })
-        if ssl_count > 0:
-            factors.append({
-                "name": "Invalid SSL",
-                "count": ssl_count,
-                "percentage": round((ssl_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with missing security headers (check both top-level and nested)
-        headers_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "$or": [
-                {"http_security_headers_score": {"$lt": 3}},
-                {"misconfigurations.web_headers.has_issues": True}
-            ]
-        })
-        if headers_count > 0:
-            factors.append({
-                "name": "Missing Security Headers",
-                "count": headers_count,
-                "percentage": round((headers_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with SSL/TLS issues (check nested misconfigurations)
-        ssl_issues_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.ssl.has_issues": {"$eq": True}
-        })
-        if ssl_issues_count > 0:
-            factors.append({
-                "name": "SSL/TLS Issues",
-                "count": ssl_issues_count,
-                "percentage": round((ssl_issues_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with DNS misconfigurations
-        dns_issues_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.dns.has_issues": {"$eq": True}
-        })
-        if dns_issues_count > 0:
-            factors.append({
-                "name": "DNS Misconfigurations",
-                "count": dns_issues_count,
-                "percentage": round((dns_issues_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with exposed cloud buckets
-        cloud_buckets_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.cloud_buckets.has_issues": {"$eq": True}
-        })
-        if cloud_buckets_count > 0:
-            factors.append({
-                "name": "Exposed Cloud Storage",
-                "count": cloud_buckets_count,
-                "percentage": round((cloud_buckets_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with exposed sensitive files
-        security_files_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.security_files.has_issues": {"$eq": True}
-        })
-        if security_files_count > 0:
-            factors.append({
-                "name": "Exposed Sensitive Files",
-                "count": security_files_count,
-                "percentage": round((security_files_count / total_assets) * 100, 1)
-            })
-
-        # Count assets with open directories
-        open_dirs_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.open_directories.has_issues": {"$eq": True}
-        })
-        if open_dirs_count > 0:
-            factors.append({
-                "name": "Open Directories",
-                "count": open_dirs_count,
-                "percentage": round((open_dirs_count / total_assets) * 100, 1)
-            })
+        # Top 8 factors, already sorted when the summary was computed
+        return {"data": {"factors": summary["risk_factors"], "total_assets": total_assets}}
 
-        # Count assets with breach history
-        breach_count = await assets_collection.count_documents({
-            "user_id": uid,
-            "breach_history_count": {"$gt": 0}
-        })
-        if breach_count > 0:
-            factors.append({
-                "name": "Breach History",
-                "count": breach_count,
-                "percentage": round((breach_count / total_assets) * 100, 1)
-            })
-
-        # Sort by percentage descending
-        factors.sort(key=lambda x: x["percentage"], reverse=True)
-
-        return {"data": {"factors": factors[:8], "total_assets": total_assets}}  # Return top 8 with total
+    try:
+        return await cached(f"{uid}:risk-factors", ANALYTICS_CACHE_TTL, compute)
 
     except Exception as e:
         logger.error(f"Failed to get risk factors: {str(e)}")
@@ -508,34 +420,28 @@ async def get_risk_factors(request: Request):
 
 
 @router.get("/security-insights")
-async def get_security_insights(request: Request):
+async def get_security_insights(uid: str = Depends(get_current_uid)):
     """
     Get actionable security insights based on real asset data.
 
     Returns:
         Personalized security recommendations
     """
-    user = get_current_user(request)
-    uid = user["uid"]
-
-    try:
-        assets_collection = get_collection("assets")
-        scans_collection = get_collection("scans")
+    async def compute() -> dict:
+        summary = await get_user_summary(uid)
 
         insights = []
 
-        # Get total assets and high-risk assets
-        total_assets = await assets_collection.count_documents({"user_id": uid})
-        high_risk_assets = await assets_collection.count_documents({
-            "user_id": uid,
-            "risk_score": {"$gte": 70}
-        })
-
-        # Get last scan info
-        last_scan = await scans_collection.find_one(
-            {"user_id": uid, "scan_status": "completed"},
-            sort=[("completed_at", -1)]
-        )
+        total_assets = summary["total_assets"]
+        high_risk_assets = summary["high_risk_count"]
+        ssh_exposed = summary["ssh_count"]
+        db_exposed = summary["db_count"]
+        ssl_problems = summary["ssl_problems"]
+        missing_headers = summary["missing_headers"]
+        dns_issues = summary["dns_issues"]
+        cloud_buckets = summary["cloud_buckets"]
+        sensitive_files = summary["sensitive_files"]
+        open_dirs = summary["open_dirs"]
 
         # Insight 1: High-Risk Assets
         if high_risk_assets > 0:
@@ -544,6 +450,7 @@ async def get_security_insights(request: Request):
                 "title": "Critical Assets Detected",
                 "message": f"{high_risk_assets} asset(s) have risk scores above 70 and require immediate attention.",
                 "priority": "critical",
+                "_p": P_CRIT,
                 "stats": {
                     "count": high_risk_assets,
                     "total": total_assets
@@ -551,16 +458,6 @@ async def get_security_insights(request: Request):
             })
 
         # Insight 3: Exposed Services
-        ssh_exposed = await assets_collection.count_documents({
-            "user_id": uid,
-            "open_ports": {"$in": [22]}  # More explicit array check
-        })
-        
-        db_exposed = await assets_collection.count_documents({
-            "user_id": uid,
-            "open_ports": {"$in": [3306, 5432, 27017, 6379]}  # Check if any DB port is in array
-        })
-
         if ssh_exposed > 0 or db_exposed > 0:
             exposed_services = []
             if ssh_exposed > 0:
@@ -573,49 +470,27 @@ async def get_security_insights(request: Request):
                 "title": "Exposed Services",
                 "message": f"Found {', '.join(exposed_services)} port(s) exposed to the internet. Review access controls.",
                 "priority": "high",
+                "_p": P_HIGH,
                 "stats": {
                     "ssh": ssh_exposed,
                     "database": db_exposed
                 }
             })
 
-        # Insight 3: SSL/TLS Status (check both top-level and nested)
-        invalid_ssl_top = await assets_collection.count_documents({
-            "user_id": uid,
-            "ssl_cert_valid": False
-        })
-        
-        ssl_issues_nested = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.ssl.has_issues": {"$eq": True}
-        })
-        
-        invalid_ssl = max(invalid_ssl_top, ssl_issues_nested)
-
-        if invalid_ssl > 0:
+        # Insight 3: SSL/TLS Status (assets with top-level or nested issues)
+        if ssl_problems > 0:
             insights.append({
                 "type": "warning",
                 "title": "SSL Certificate Issues",
-                "message": f"{invalid_ssl} asset(s) have SSL/TLS certificate issues. This affects trust and security.",
+                "message": f"{ssl_problems} asset(s) have SSL/TLS certificate issues. This affects trust and security.",
                 "priority": "high",
+                "_p": P_HIGH,
                 "stats": {
-                    "count": invalid_ssl
+                    "count": ssl_problems
                 }
             })
 
-        # Insight 4: Security Headers (check both top-level and nested)
-        missing_headers_top = await assets_collection.count_documents({
-            "user_id": uid,
-            "http_security_headers_score": {"$lt": 3}
-        })
-        
-        missing_headers_nested = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.web_headers.has_issues": {"$eq": True}
-        })
-        
-        missing_headers = max(missing_headers_top, missing_headers_nested)
-
+        # Insight 4: Security Headers (assets with top-level or nested issues)
         if missing_headers > 0:
             percentage = round((missing_headers / total_assets) * 100) if total_assets > 0 else 0
             insights.append({
@@ -623,6 +498,7 @@ async def get_security_insights(request: Request):
                 "title": "Security Headers",
                 "message": f"{percentage}% of assets are missing critical security headers. Consider implementing CSP, HSTS, and X-Frame-Options.",
                 "priority": "medium",
+                "_p": P_MED,
                 "stats": {
                     "count": missing_headers,
                     "percentage": percentage
@@ -630,11 +506,6 @@ async def get_security_insights(request: Request):
             })
 
         # Insight 5: DNS Misconfigurations
-        dns_issues = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.dns.has_issues": {"$eq": True}
-        })
-        
         if dns_issues > 0:
             percentage = round((dns_issues / total_assets) * 100) if total_assets > 0 else 0
             insights.append({
@@ -642,6 +513,7 @@ async def get_security_insights(request: Request):
                 "title": "DNS Misconfigurations",
                 "message": f"{dns_issues} asset(s) have DNS misconfigurations (missing SPF, DMARC, or other DNS records). This can lead to email spoofing and security issues.",
                 "priority": "high",
+                "_p": P_HIGH,
                 "stats": {
                     "count": dns_issues,
                     "percentage": percentage
@@ -649,51 +521,39 @@ async def get_security_insights(request: Request):
             })
 
         # Insight 6: Exposed Cloud Storage
-        cloud_buckets = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.cloud_buckets.has_issues": {"$eq": True}
-        })
-        
         if cloud_buckets > 0:
             insights.append({
                 "type": "critical",
                 "title": "Exposed Cloud Storage",
                 "message": f"{cloud_buckets} asset(s) have exposed cloud storage buckets. This is a critical security risk that can lead to data breaches.",
                 "priority": "critical",
+                "_p": P_CRIT,
                 "stats": {
                     "count": cloud_buckets
                 }
             })
 
         # Insight 7: Exposed Sensitive Files
-        sensitive_files = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.security_files.has_issues": {"$eq": True}
-        })
-        
         if sensitive_files > 0:
             insights.append({
                 "type": "critical",
                 "title": "Exposed Sensitive Files",
                 "message": f"{sensitive_files} asset(s) have exposed sensitive files (config files, credentials, etc.). This is a critical security risk.",
                 "priority": "critical",
+                "_p": P_CRIT,
                 "stats": {
                     "count": sensitive_files
                 }
             })
 
         # Insight 8: Open Directories
-        open_dirs = await assets_collection.count_documents({
-            "user_id": uid,
-            "misconfigurations.open_directories.has_issues": {"$eq": True}
-        })
-        
         if open_dirs > 0:
             insights.append({
                 "type": "warning",
                 "title": "Open Directory Listings",
                 "message": f"{open_dirs} asset(s) have open directory listings enabled. This exposes file structure and can lead to information disclosure.",
                 "priority": "medium",
+                "_p": P_MED,
                 "stats": {
                     "count": open_dirs
                 }
@@ -701,19 +561,32 @@ async def get_security_insights(request: Request):
 
         # Insight 10: Asset Growth Trend (renumbered)
 
-        # Sort by priority
-        priority_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
-        insights.sort(key=lambda x: priority_order.get(x["priority"], 4))
+        # Sort by priority, then drop the internal sort key from the response
+        insights.sort(key=itemgetter("_p"))
+        for insight in insights:
+            del insight["_p"]
 
-        # Generate AI-powered recommendations for high-priority insights
-        try:
-            insights = await generate_batch_recommendations(insights)
-        except Exception as e:
-            logger.warning(f"Failed to generate LLM recommendations: {str(e)}")
-            # Continue without recommendations if LLM fails
+        # Generate AI-powered recommendations for high-priority insights, which
+        # lead the sorted list; skip the LLM entirely when there are none
+        high_priority_count = min(
+            sum(1 for insight in insights if insight["priority"] in ("critical", "high")),
+            MAX_RECOMMENDED_INSIGHTS
+        )
+        if high_priority_count:
+            try:
+                insights = (
+                    await generate_batch_recommendations(insights[:high_priority_count])
+                    + insights[high_priority_count:]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to generate LLM recommendations: {str(e)}")
+                # Continue without recommendations if LLM fails
 
         return {"data": {"insights": insights}}
 
+    try:
+        return await cached(f"{uid}:security-insights", ANALYTICS_CACHE_TTL, compute)
+
     except Exception as e:
         logger.error(f"Failed to get security insights: {str(e)}")
         return {"data": {"insights": []}}
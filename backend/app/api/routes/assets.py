@@ -2,22 +2,259 @@
 Asset Discovery and Management API Routes
 """
 
+import asyncio
+import base64
+import hashlib
 import logging
-from datetime import datetime
-from typing import Optional
+import re
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter, Request, HTTPException, Query
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import csv
 import io
+import orjson
+from bson import ObjectId, json_util
 from pydantic import BaseModel
-
+from pymongo import ReturnDocument
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+from app.core.cache import blob_cache, cached
+from app.tasks.scan_queue import enqueue_scan
 from app.core.database import get_collection
 from app.middleware.auth import get_current_user
+from app.services.analytics_summary import clear_user_summary
 from app.services.groq_service import generate_misconfiguration_recommendations, generate_summary_report_recommendations, generate_security_terms
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/assets", tags=["assets"])
+router = APIRouter(
+    prefix="/api/assets",
+    tags=["assets"],
+    default_response_class=ORJSONResponse,
+)
+
+# Manual scan credits for Free users without an explicit limit
+DEFAULT_SCAN_CREDITS_LIMIT = 10
+
+# Update pipeline charging one scan credit to Free users (missing plan = Free)
+SCAN_CREDIT_RESERVATION = [
+    {
+        "$set": {
+            "scan_credits_used": {
+                "$cond": [
+                    {"$eq": [{"$ifNull": ["$plan", "free"]}, "free"]},
+                    {"$add": [{"$ifNull": ["$scan_credits_used", 0]}, 1]},
+                    {"$ifNull": ["$scan_credits_used", 0]}
+                ]
+            }
+        }
+    }
+]
+
+# Seconds a filtered asset count is reused across listing pages
+ASSET_COUNT_CACHE_TTL = 30
+
+# Seconds a serialized listing page is kept (keyed by its ETag, so never stale)
+ASSET_PAGE_CACHE_TTL = 120
+
+# Asset responses may be stored by the browser but must be revalidated via ETag
+ASSETS_CACHE_CONTROL = "private, no-cache"
+
+# Risk levels listed in the detailed report's findings, with section titles
+DETAILED_REPORT_RISK_LEVELS = [
+    ("critical", "Critical Risk Assets"),
+    ("high", "High Risk Assets"),
+    ("medium", "Medium Risk Assets"),
+]
+
+# Assets listed per risk level in the detailed report
+DETAILED_REPORT_TOP_ASSETS = 20
+
+# Header row of the detailed report's findings tables
+DETAILED_REPORT_FINDINGS_HEADER = ["Asset", "Type", "Risk Score", "Issues", "Last Scanned"]
+
+# Fields rendered for each asset in the detailed report's findings
+DETAILED_REPORT_ASSET_PROJECTION = {
+    "_id": 0,
+    "asset_value": 1,
+    "asset_type": 1,
+    "risk_score": 1,
+    "misconfigurations.total_issues": 1,
+    "last_scanned_at": 1,
+}
+
+# Column headers of the CSV asset export
+CSV_EXPORT_HEADER = [
+    "Asset",
+    "Type",
+    "Risk Score",
+    "Risk Level",
+    "HTTP Status",
+    "Last Scanned",
+    "Missing Headers Count",
+    "SSL Issues Count",
+    "DNS Issues Count",
+    "Cloud Buckets Exposed",
+    "Sensitive Files Exposed",
+    "Open Directories",
+    "Breach History Count"
+]
+
+# Documents fetched per cursor round-trip when exporting
+EXPORT_BATCH_SIZE = 500
+
+# Maximum PDF exports rendered at once per worker
+PDF_RENDER_SEMAPHORE = asyncio.Semaphore(2)
+
+# Seconds a rendered PDF export is kept for concurrent or repeated downloads
+PDF_EXPORT_CACHE_TTL = 60
+
+# Misconfiguration issue counts in the exports: label, count field, source array
+EXPORT_ISSUE_COUNTS = [
+    ("Missing Security Headers", "missing_headers_count", "misconfigurations.web_headers.missing_headers"),
+    ("SSL/TLS Issues", "ssl_issues_count", "misconfigurations.ssl.issues"),
+    ("DNS Misconfigurations", "dns_issues_count", "misconfigurations.dns.issues"),
+    ("Exposed Cloud Storage", "cloud_buckets_count", "misconfigurations.cloud_buckets.buckets"),
+    ("Exposed Sensitive Files", "sensitive_files_count", "misconfigurations.security_files.sensitive_exposed"),
+    ("Open Directory Listings", "open_dirs_count", "misconfigurations.open_directories.open_directories"),
+]
+
+# Maximum assets summarized for the AI summary and terms prompts
+RECOMMENDATION_ASSET_LIMIT = 1000
+
+# Fields the AI summary and terms prompts read: risk level, breach count and
+# each category's issue array and has_issues flag
+RECOMMENDATION_ASSET_PROJECTION = {
+    "_id": 0,
+    "risk_level": 1,
+    "breach_history_count": 1,
+    **{path: 1 for _, _, path in EXPORT_ISSUE_COUNTS},
+    **{f"{path.rsplit('.', 1)[0]}.has_issues": 1 for _, _, path in EXPORT_ISSUE_COUNTS},
+}
+
+# Static PDF export content, built once at import
+if REPORTLAB_AVAILABLE:
+    # Building the sample stylesheet is costly, so it is built once and shared;
+    # the report styles below must not be mutated per request
+    PDF_STYLES = getSampleStyleSheet()
+
+    REPORT_TITLE_STYLE = ParagraphStyle(
+        'CustomTitle',
+        parent=PDF_STYLES['Title'],
+        fontSize=24,
+        textColor=colors.HexColor('#1f2937'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    REPORT_HEADING_STYLE = ParagraphStyle(
+        'CustomHeading',
+        parent=PDF_STYLES['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#1f2937'),
+        spaceAfter=12,
+        spaceBefore=12
+    )
+    REPORT_SUBHEADING_STYLE = ParagraphStyle(
+        'CustomSubHeading',
+        parent=PDF_STYLES['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#374151'),
+        spaceAfter=8,
+        spaceBefore=8
+    )
+    REPORT_FOOTER_STYLE = ParagraphStyle(
+        'Footer',
+        parent=PDF_STYLES['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    )
+
+    # SME-friendly vulnerability terms, with the table header row
+    SIMPLE_TERMS_ROWS = [
+        ["Technical", "Simple Term"],
+        ["Phishing", "Fake Message"],
+        ["Smishing", "Fake SMS"],
+        ["Vishing", "Fake Call"],
+        ["Whaling", "Boss Scam"],
+        ["Baiting", "Free Trap"],
+        ["Malware", "Harmful File"],
+        ["Ransomware", "Lock Attack"],
+        ["Data Leak", "Info Spill"],
+        ["Weak Passwords", "Easy Login"],
+    ]
+
+    _PDF_HEADER_ROW = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]
+    _PDF_SHADED_BODY = ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f3f4f6"))
+
+    # Detailed report tables
+    REPORT_SUMMARY_TABLE_STYLE = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 12),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
+        ("FONTSIZE", (0, 1), (-1, -1), 10),
+    ])
+    REPORT_ASSETS_TABLE_STYLE = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 10),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
+        ("FONTSIZE", (0, 1), (-1, -1), 8),
+    ])
+    REPORT_MISCONFIGURATION_TABLE_STYLE = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 11),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
+        ("FONTSIZE", (0, 1), (-1, -1), 10),
+    ])
+
+    # Summary export tables
+    TERMS_TABLE_STYLE = TableStyle(_PDF_HEADER_ROW + [("ALIGN", (0, 0), (-1, -1), "LEFT"), _PDF_SHADED_BODY])
+    ASSETS_TABLE_STYLE = TableStyle(_PDF_HEADER_ROW)
+    MISCONFIGURATION_TABLE_STYLE = TableStyle(_PDF_HEADER_ROW + [_PDF_SHADED_BODY])
+
+# Fields rendered by the exports, with issue arrays reduced to their $size
+# (0 when the field is missing or not an array, which $size would reject)
+EXPORT_PROJECTION = {
+    "_id": 0,
+    "asset_value": 1,
+    "asset_type": 1,
+    "risk_score": 1,
+    "risk_level": 1,
+    "http_status": 1,
+    "last_scanned_at": 1,
+    "breach_history_count": 1,
+    **{
+        key: {"$cond": [{"$isArray": f"${path}"}, {"$size": f"${path}"}, 0]}
+        for _, key, path in EXPORT_ISSUE_COUNTS
+    },
+}
 
 
 # Request/Response models
@@ -38,7 +275,7 @@ async def start_asset_scan(request: Request, scan_request: ScanRequest):
     """
     Start new asset discovery scan for a domain.
     
-    Runs scan directly as background task.
+    Queues the scan for the background scan workers.
     """
     user = get_current_user(request)
     uid = user["uid"]
@@ -47,27 +284,51 @@ async def start_asset_scan(request: Request, scan_request: ScanRequest):
         users_collection = get_collection("users")
         scans_collection = get_collection("scans")
 
-        # Get user to check plan and credits
-        user_doc = await users_collection.find_one({"uid": uid})
+        # Atomically reserve a scan credit: Free users only match while under
+        # their limit, so concurrent requests cannot overspend
+        user_doc = await users_collection.find_one_and_update(
+            {
+                "uid": uid,
+                "$or": [
+                    {"plan": {"$nin": [None, "free"]}},
+                    {
+                        "$expr": {
+                            "$lt": [
+                                {"$ifNull": ["$scan_credits_used", 0]},
+                                {"$ifNull": ["$scan_credits_limit", DEFAULT_SCAN_CREDITS_LIMIT]}
+                            ]
+                        }
+                    }
+                ]
+            },
+            SCAN_CREDIT_RESERVATION,
+            projection={"_id": 0, "plan": 1},
+            return_document=ReturnDocument.AFTER
+        )
+
         if not user_doc:
-            raise HTTPException(status_code=404, detail="User not found")
+            # Only the error path pays for a second lookup to tell the cases apart
+            user_doc = await users_collection.find_one(
+                {"uid": uid},
+                projection={"_id": 0, "scan_credits_limit": 1}
+            )
+            if not user_doc:
+                raise HTTPException(status_code=404, detail="User not found")
 
-        user_plan = user_doc.get("plan", "free")
-        
-        # Check scan credits (only for Free users)
-        if user_plan == "free":
-            credits_used = user_doc.get("scan_credits_used", 0)
-            credits_limit = user_doc.get("scan_credits_limit", 10)
-
-            if credits_used >= credits_limit:
-                raise HTTPException(
-                    status_code=402,
-                    detail=f"Manual scan limit reached ({credits_limit} scans). Upgrade to Pro for unlimited manual scans and continuous monitoring."
-                )
+            credits_limit = user_doc.get("scan_credits_limit", DEFAULT_SCAN_CREDITS_LIMIT)
+            raise HTTPException(
+                status_code=402,
+                detail=f"Manual scan limit reached ({credits_limit} scans). Upgrade to Pro for unlimited manual scans and continuous monitoring."
+            )
         # Pro users have unlimited manual scans
 
-        # Create scan record
-        scan_id = f"scn_{datetime.utcnow().timestamp()}"
+        user_plan = user_doc.get("plan") or "free"
+
+        # Create scan record (one timestamp for the record and the estimate)
+        now = datetime.utcnow()
+        # Millisecond time prefix keeps IDs sortable; the random suffix keeps
+        # concurrent requests from colliding
+        scan_id = f"scn_{time.time_ns() // 1_000_000:012x}{secrets.token_hex(8)}"
         scan_doc = {
             "scan_id": scan_id,
             "user_id": uid,
@@ -76,33 +337,29 @@ async def start_asset_scan(request: Request, scan_request: ScanRequest):
             "scan_type": "full",
             "scan_status": "pending",
             "scan_subdomains": scan_request.scan_subdomains,
-            "created_at": datetime.utcnow(),
+            "created_at": now,
             "started_at": None,
             "completed_at": None,
         }
 
-        await scans_collection.insert_one(scan_doc)
-
-        # Increment scan credits used (only for Free users)
-        if user_plan == "free":
-            await users_collection.update_one(
-                {"uid": uid},
-                {"$inc": {"scan_credits_used": 1}}
-            )
+        try:
+            await scans_collection.insert_one(scan_doc)
+        except Exception:
+            # Give the reserved credit back if the scan was never created
+            if user_plan == "free":
+                await users_collection.update_one(
+                    {"uid": uid},
+                    {"$inc": {"scan_credits_used": -1}}
+                )
+            raise
 
-        # Run scan directly as background task
-        import asyncio
-        from app.tasks.scan_worker import _execute_scan_async
-        
-        # Create background task to run scan
-        asyncio.create_task(_execute_scan_async(scan_id, scan_request.domain, uid))
-        logger.info(f"Started scan job: {scan_id} for {scan_request.domain}")
+        # Hand the scan to the bounded worker pool; the pending scan record
+        # lets it be re-queued if this process restarts before it runs
+        enqueue_scan(scan_id, scan_request.domain, uid)
+        logger.info(f"Queued scan job: {scan_id} for {scan_request.domain}")
 
         # Estimate completion time (2-5 minutes)
-        estimated_completion = datetime.utcnow()
-        estimated_completion = estimated_completion.replace(
-            minute=estimated_completion.minute + 3
-        )
+        estimated_completion = now + timedelta(minutes=3)
 
         return {
             "data": {
@@ -121,6 +378,122 @@ async def start_asset_scan(request: Request, scan_request: ScanRequest):
         raise HTTPException(status_code=500, detail="Failed to start scan")
 
 
+async def _latest_asset_update(uid: str) -> Optional[datetime]:
+    """
+    Get the most recent updated_at across the user's assets.
+
+    The value changes whenever any of the user's assets is written (scans
+    upsert with a fresh updated_at) or all of them are cleared.
+
+    Args:
+        uid: User ID (Firebase UID)
+
+    Returns:
+        Latest updated_at, or None when the user has no assets
+    """
+    latest = await get_collection("assets").find_one(
+        {"user_id": uid},
+        projection={"_id": 0, "updated_at": 1},
+        sort=[("updated_at", -1)]
+    )
+    return latest.get("updated_at") if latest else None
+
+
+def _assets_etag(uid: str, stamp: Optional[datetime], *parts) -> str:
+    """
+    Build a weak ETag for a view of the user's assets.
+
+    Args:
+        uid: User ID (Firebase UID)
+        stamp: Result of _latest_asset_update for the user
+        *parts: Request parameters that shape the response
+
+    Returns:
+        Weak ETag header value
+    """
+    digest = hashlib.sha1(repr((uid, stamp) + parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Return a 304 response when the client already holds the given ETag.
+
+    Args:
+        request: FastAPI request object
+        etag: Current ETag of the resource
+
+    Returns:
+        304 Response, or None when the body must be sent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ASSETS_CACHE_CONTROL})
+    return None
+
+
+def _encode_page_cursor(last_value, last_id) -> str:
+    """
+    Encode the sort value and _id of a page's last asset as an opaque cursor.
+
+    Args:
+        last_value: Sort field value of the last asset
+        last_id: MongoDB _id of the last asset
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json_util.dumps({"v": last_value, "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_page_cursor(after: str) -> tuple:
+    """
+    Decode a cursor produced by _encode_page_cursor.
+
+    Args:
+        after: Cursor string from a previous page
+
+    Returns:
+        Tuple of (last_value, last_id)
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(after.encode("ascii")))
+        return payload["v"], payload["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _keyset_conditions(sort_field: str, sort_direction: int, last_value, last_id) -> list:
+    """
+    Build the $or conditions selecting assets after the given sort position.
+
+    Args:
+        sort_field: Field the listing is sorted by
+        sort_direction: 1 for ascending, -1 for descending
+        last_value: Sort field value of the previous page's last asset
+        last_id: _id of the previous page's last asset
+
+    Returns:
+        List of conditions for a $or clause
+    """
+    op = "$lt" if sort_direction == -1 else "$gt"
+
+    conditions = [{sort_field: last_value, "_id": {op: last_id}}]
+
+    # Missing values sort lowest and range operators never match across
+    # types, so null is handled explicitly on either side
+    if last_value is None:
+        if sort_direction == 1:
+            conditions.append({sort_field: {"$ne": None}})
+    else:
+        conditions.append({sort_field: {op: last_value}})
+        if sort_direction == -1:
+            conditions.append({sort_field: None})
+
+    return conditions
+
+
 @router.get("/")
 async def list_assets(
     request: Request,
@@ -130,10 +503,14 @@ async def list_assets(
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
     risk_level: Optional[str] = Query(None, regex="^(low|medium|high|critical)$"),
     asset_type: Optional[str] = Query(None, regex="^(domain|subdomain|ip_address)$"),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
     List all assets for current user with pagination and filtering.
+
+    Pass the returned next_cursor as after to fetch the following page with
+    an index seek instead of skipping over earlier pages.
     """
     user = get_current_user(request)
     uid = user["uid"]
@@ -141,51 +518,342 @@ async def list_assets(
     try:
         assets_collection = get_collection("assets")
 
-        # Build query
-        query = {"user_id": uid}
-
-        if risk_level:
-            query["risk_level"] = risk_level
-
-        if asset_type:
-            query["asset_type"] = asset_type
-
-        if search:
-            query["asset_value"] = {"$regex": search, "$options": "i"}
+        # Skip the listing entirely when the client's copy is current
+        stamp = await _latest_asset_update(uid)
+        etag = _assets_etag(uid, stamp, page, limit, sort_by, sort_order, risk_level, asset_type, search, after)
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        async def build_page() -> bytes:
+            # Build query
+            query = {"user_id": uid}
+
+            if risk_level:
+                query["risk_level"] = risk_level
+
+            if asset_type:
+                query["asset_type"] = asset_type
+
+            if search:
+                # Escaped, case-sensitive match on the lowercased copy so the
+                # (user_id, asset_value_lc) index bounds the scan to this user's
+                # keys rather than fetching every document
+                query["asset_value_lc"] = {"$regex": re.escape(search.lower())}
+
+            # Sort (_id breaks ties so keyset pages never overlap or skip; asset_value
+            # is unique per user and served directly by the unique index)
+            sort_field = sort_by
+            sort_direction = -1 if sort_order == "desc" else 1
+            sort_spec = [(sort_field, sort_direction)]
+            if sort_field != "asset_value":
+                sort_spec.append(("_id", sort_direction))
+
+            # Paginate: seek past the previous page's last asset when a cursor is
+            # given, otherwise fall back to page-number offsets
+            if after:
+                last_value, last_id = _decode_page_cursor(after)
+                page_query = {**query, "$or": _keyset_conditions(sort_field, sort_direction, last_value, last_id)}
+                cursor = assets_collection.find(page_query).sort(sort_spec).limit(limit)
+            else:
+                skip = (page - 1) * limit
+                cursor = assets_collection.find(query).sort(sort_spec).skip(skip).limit(limit)
+
+            # Count total, cached per filter and asset state so it always matches
+            # the page it is served with
+            count_key = f"{uid}:asset-count:{stamp}:{risk_level}:{asset_type}:{search}"
+            total, assets = await asyncio.gather(
+                cached(count_key, ASSET_COUNT_CACHE_TTL, lambda: assets_collection.count_documents(query)),
+                cursor.to_list(length=limit),
+            )
 
-        # Count total
-        total = await assets_collection.count_documents(query)
+            next_cursor = None
+            if len(assets) == limit:
+                last = assets[-1]
+                next_cursor = _encode_page_cursor(last.get(sort_field), last["_id"])
 
-        # Sort
-        sort_field = sort_by
-        sort_direction = -1 if sort_order == "desc" else 1
+            # _id is fetched only as the keyset tie-breaker; drop it from the payload
+            for asset in assets:
+                asset.pop("_id", None)
 
-        # Paginate
-        skip = (page - 1) * limit
-        cursor = assets_collection.find(query).sort(sort_field, sort_direction).skip(skip).limit(limit)
-        assets = await cursor.to_list(length=limit)
+            return orjson.dumps({
+                "data": {
+                    "assets": assets,
+                    # Same digest as the ETag; lets clients skip re-rendering an
+                    # unchanged page without comparing the asset list
+                    "fingerprint": etag[3:-1],
+                    "pagination": {
+                        "page": page,
+                        "limit": limit,
+                        "total": total,
+                        "total_pages": (total + limit - 1) // limit,
+                        "next_cursor": next_cursor
+                    }
+                }
+            })
 
-        # Remove MongoDB _id
-        for asset in assets:
-            asset.pop("_id", None)
+        # The ETag identifies the page contents, so it doubles as the cache key
+        # for the serialized page; repeat requests skip Mongo and encoding
+        body = await cached(f"{uid}:assets-page:{etag}", ASSET_PAGE_CACHE_TTL, build_page, store=blob_cache)
 
-        return {
-            "data": {
-                "assets": assets,
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": total,
-                    "total_pages": (total + limit - 1) // limit
-                }
-            }
-        }
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": ASSETS_CACHE_CONTROL}
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list assets: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve assets")
 
 
+def _detailed_report_pipeline(uid: str) -> list:
+    """
+    Build the aggregation feeding the detailed security report.
+
+    Args:
+        uid: User ID
+
+    Returns:
+        Pipeline yielding one document with a "summary" row of totals and,
+        per risk level, that level's highest-risk assets
+    """
+    def array_size(path: str) -> dict:
+        return {"$cond": [{"$isArray": f"${path}"}, {"$size": f"${path}"}, 0]}
+
+    def count_if(condition) -> dict:
+        return {"$sum": {"$cond": [condition, 1, 0]}}
+
+    summary = {
+        "_id": None,
+        "total_assets": {"$sum": 1},
+        "high_risk": count_if({"$in": ["$risk_level", ["high", "critical"]]}),
+        "medium_risk": count_if({"$eq": ["$risk_level", "medium"]}),
+        "low_risk": count_if({"$eq": ["$risk_level", "low"]}),
+        "total_breaches": {"$sum": {"$ifNull": ["$breach_history_count", 0]}},
+        "breached_assets": count_if({"$gt": ["$breach_history_count", 0]}),
+    }
+    for _, key, path in EXPORT_ISSUE_COUNTS:
+        summary[key] = {"$sum": array_size(path)}
+        # Each category's has_issues flag sits beside its issue array
+        summary[f"{key}_affected"] = count_if(f"${path.rsplit('.', 1)[0]}.has_issues")
+
+    top_assets = {
+        risk_level: [
+            {"$match": {"risk_level": risk_level}},
+            {"$sort": {"risk_score": -1}},
+            {"$limit": DETAILED_REPORT_TOP_ASSETS},
+            {"$project": DETAILED_REPORT_ASSET_PROJECTION},
+        ]
+        for risk_level, _ in DETAILED_REPORT_RISK_LEVELS
+    }
+
+    return [
+        {"$match": {"user_id": uid}},
+        {"$facet": {"summary": [{"$group": summary}, {"$project": {"_id": 0}}], **top_assets}},
+    ]
+
+
+def _render_detailed_pdf(stats: dict, top_assets: dict, buffer) -> None:
+    """
+    Render the detailed security report (CPU-bound; run off the event loop).
+
+    Args:
+        stats: Summary row from the detailed report pipeline
+        top_assets: Highest-risk assets per risk level, from the same pipeline
+        buffer: Binary file the PDF is written to
+    """
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=A4, 
+        topMargin=0.75*inch, 
+        bottomMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        rightMargin=0.75*inch
+    )
+    styles = PDF_STYLES
+    story = []
+    
+    # Custom styles
+    title_style = REPORT_TITLE_STYLE
+    heading_style = REPORT_HEADING_STYLE
+    subheading_style = REPORT_SUBHEADING_STYLE
+    
+    # Title Page
+    story.append(Spacer(1, 2*inch))
+    story.append(Paragraph("RECON-AI", title_style))
+    story.append(Paragraph("Detailed Security Report", styles['Heading2']))
+    story.append(Spacer(1, 0.5*inch))
+    story.append(Paragraph(f"Generated: {datetime.utcnow().strftime('%B %d, %Y at %I:%M %p UTC')}", styles['Normal']))
+    story.append(Spacer(1, 0.3*inch))
+    story.append(Paragraph(f"Total Assets Scanned: <b>{stats['total_assets']}</b>", styles['Normal']))
+    story.append(PageBreak())
+    
+    # Executive Summary
+    story.append(Paragraph("Executive Summary", heading_style))
+    
+    # Statistics computed server-side by the detailed report pipeline
+    total_assets = stats["total_assets"]
+    high_risk = stats["high_risk"]
+    medium_risk = stats["medium_risk"]
+    low_risk = stats["low_risk"]
+    missing_headers = stats["missing_headers_count"]
+    ssl_issues = stats["ssl_issues_count"]
+    dns_issues = stats["dns_issues_count"]
+    exposed_buckets = stats["cloud_buckets_count"]
+    exposed_files = stats["sensitive_files_count"]
+    open_dirs = stats["open_dirs_count"]
+    total_breaches = stats["total_breaches"]
+    
+    summary_data = [
+        ["Metric", "Value"],
+        ["Total Assets", str(total_assets)],
+        ["High/Critical Risk Assets", str(high_risk)],
+        ["Medium Risk Assets", str(medium_risk)],
+        ["Low Risk Assets", str(low_risk)],
+        ["Missing Security Headers", str(missing_headers)],
+        ["SSL/TLS Issues", str(ssl_issues)],
+        ["DNS Misconfigurations", str(dns_issues)],
+        ["Exposed Cloud Storage", str(exposed_buckets)],
+        ["Sensitive Files Exposed", str(exposed_files)],
+        ["Open Directories", str(open_dirs)],
+        ["Historical Data Breaches", str(total_breaches)],
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(REPORT_SUMMARY_TABLE_STYLE)
+    story.append(summary_table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Risk Assessment
+    story.append(Paragraph("Risk Assessment", heading_style))
+    risk_text = f"""
+    This security assessment identified <b>{total_assets}</b> assets with varying levels of risk. 
+    <b>{high_risk}</b> assets require immediate attention due to high or critical risk scores. 
+    The scan detected <b>{missing_headers + ssl_issues + dns_issues + exposed_buckets + exposed_files + open_dirs}</b> 
+    total security misconfigurations across all assets.
+    """
+    story.append(Paragraph(risk_text, styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+    
+    # Detailed Asset Findings
+    story.append(PageBreak())
+    story.append(Paragraph("Detailed Asset Findings", heading_style))
+    
+    # Assets grouped by risk level (already limited to the top few per level)
+    for risk_level, title in DETAILED_REPORT_RISK_LEVELS:
+        asset_list = top_assets.get(risk_level)
+        if asset_list:
+            story.append(Paragraph(title, subheading_style))
+            
+            asset_data = [DETAILED_REPORT_FINDINGS_HEADER]
+            for asset in asset_list:
+                misc = asset.get('misconfigurations', {}) or {}
+                total_issues = misc.get('total_issues', 0)
+                last_scanned = asset.get('last_scanned_at')
+                if last_scanned:
+                    if isinstance(last_scanned, str):
+                        last_scanned_str = last_scanned[:10]
+                    else:
+                        # It's a datetime object
+                        last_scanned_str = str(last_scanned)[:10]
+                else:
+                    last_scanned_str = 'Never'
+                
+                asset_data.append([
+                    asset.get('asset_value', 'N/A')[:40],
+                    asset.get('asset_type', 'N/A'),
+                    str(asset.get('risk_score', 0)),
+                    str(total_issues),
+                    last_scanned_str
+                ])
+            
+            asset_table = Table(asset_data, colWidths=[2.5*inch, 1*inch, 0.8*inch, 0.7*inch, 1*inch])
+            asset_table.setStyle(REPORT_ASSETS_TABLE_STYLE)
+            story.append(asset_table)
+            story.append(Spacer(1, 0.3*inch))
+    
+    # Security Misconfigurations Detail
+    story.append(PageBreak())
+    story.append(Paragraph("Security Misconfigurations Detail", heading_style))
+    
+    misconfig_data = [
+        ["Category", "Total Issues", "Affected Assets"]
+    ]
+    
+    # Affected assets for each category
+    headers_affected = stats["missing_headers_count_affected"]
+    ssl_affected = stats["ssl_issues_count_affected"]
+    dns_affected = stats["dns_issues_count_affected"]
+    buckets_affected = stats["cloud_buckets_count_affected"]
+    files_affected = stats["sensitive_files_count_affected"]
+    dirs_affected = stats["open_dirs_count_affected"]
+    
+    misconfig_data.extend([
+        ["Missing Security Headers", str(missing_headers), str(headers_affected)],
+        ["SSL/TLS Certificate Issues", str(ssl_issues), str(ssl_affected)],
+        ["DNS Misconfigurations", str(dns_issues), str(dns_affected)],
+        ["Exposed Cloud Storage", str(exposed_buckets), str(buckets_affected)],
+        ["Sensitive Files Exposed", str(exposed_files), str(files_affected)],
+        ["Open Directory Listings", str(open_dirs), str(dirs_affected)],
+    ])
+    
+    misconfig_table = Table(misconfig_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
+    misconfig_table.setStyle(REPORT_MISCONFIGURATION_TABLE_STYLE)
+    story.append(misconfig_table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Data Breach Information
+    if total_breaches > 0:
+        story.append(Paragraph("Data Breach History", subheading_style))
+        breach_text = f"""
+        <b>{stats['breached_assets']}</b> assets have been involved in 
+        <b>{total_breaches}</b> known data breaches according to the Have I Been Pwned database. 
+        It is recommended to review security practices and consider password rotation for affected accounts.
+        """
+        story.append(Paragraph(breach_text, styles['Normal']))
+        story.append(Spacer(1, 0.2*inch))
+    
+    # Recommendations Section
+    story.append(PageBreak())
+    story.append(Paragraph("Recommendations", heading_style))
+    
+    recommendations = []
+    if missing_headers > 0:
+        recommendations.append("Implement missing security headers (Content-Security-Policy, X-Frame-Options, etc.) to protect against common web attacks.")
+    if ssl_issues > 0:
+        recommendations.append("Review and renew SSL/TLS certificates. Ensure certificates are valid and not expired.")
+    if dns_issues > 0:
+        recommendations.append("Fix DNS misconfigurations to prevent potential DNS takeover attacks.")
+    if exposed_buckets > 0:
+        recommendations.append("Restrict access to cloud storage buckets. Ensure buckets are not publicly accessible unless necessary.")
+    if exposed_files > 0:
+        recommendations.append("Remove or restrict access to sensitive files (config files, backups, etc.) that are publicly accessible.")
+    if open_dirs > 0:
+        recommendations.append("Disable directory listings to prevent information disclosure.")
+    if total_breaches > 0:
+        recommendations.append("Review breach history and implement password rotation policies for affected accounts.")
+    if high_risk > 0:
+        recommendations.append("Prioritize remediation of high and critical risk assets immediately.")
+    
+    if not recommendations:
+        recommendations.append("No critical security issues detected. Continue monitoring and maintain current security practices.")
+    
+    for i, rec in enumerate(recommendations, 1):
+        story.append(Paragraph(f"{i}. {rec}", styles['Normal']))
+        story.append(Spacer(1, 0.15*inch))
+    
+    # Footer
+    story.append(Spacer(1, 0.5*inch))
+    story.append(Paragraph("This report was generated by RECON-AI Security Platform", REPORT_FOOTER_STYLE))
+    
+    # Build the PDF
+    logger.info("Building PDF document...")
+    doc.build(story)
+
+
 @router.get("/export-detailed-report")
 async def export_detailed_security_report(request: Request):
     """
@@ -199,325 +867,63 @@ async def export_detailed_security_report(request: Request):
         logger.info(f"Starting detailed PDF export for user {uid}")
         assets_collection = get_collection("assets")
         
-        # Fetch all assets for the user
-        assets = await assets_collection.find({"user_id": uid}).sort("risk_score", -1).to_list(length=None)
-        logger.info(f"Found {len(assets)} assets for PDF export")
-        
-        for asset in assets:
-            asset.pop("_id", None)
-        
-        if not assets:
-            logger.warning("No assets found for PDF export")
-            raise HTTPException(status_code=404, detail="No assets found to generate report")
-        
-        # PDF generation (using reportlab)
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.units import inch
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-            from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-            from datetime import datetime
-            logger.info("ReportLab imports successful")
-        except ImportError as e:
-            logger.error(f"reportlab import failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"PDF export requires reportlab. Error: {str(e)}")
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=A4, 
-            topMargin=0.75*inch, 
-            bottomMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            rightMargin=0.75*inch
-        )
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=24,
-            textColor=colors.HexColor('#1f2937'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#1f2937'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        subheading_style = ParagraphStyle(
-            'CustomSubHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#374151'),
-            spaceAfter=8,
-            spaceBefore=8
-        )
-        
-        # Title Page
-        story.append(Spacer(1, 2*inch))
-        story.append(Paragraph("RECON-AI", title_style))
-        story.append(Paragraph("Detailed Security Report", styles['Heading2']))
-        story.append(Spacer(1, 0.5*inch))
-        story.append(Paragraph(f"Generated: {datetime.utcnow().strftime('%B %d, %Y at %I:%M %p UTC')}", styles['Normal']))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph(f"Total Assets Scanned: <b>{len(assets)}</b>", styles['Normal']))
-        story.append(PageBreak())
-        
-        # Executive Summary
-        story.append(Paragraph("Executive Summary", heading_style))
-        
-        # Calculate statistics
-        total_assets = len(assets)
-        high_risk = len([a for a in assets if a.get('risk_level') in ['high', 'critical']])
-        medium_risk = len([a for a in assets if a.get('risk_level') == 'medium'])
-        low_risk = len([a for a in assets if a.get('risk_level') == 'low'])
-        
-        # Safely calculate misconfiguration counts
-        def safe_get_list(asset, *keys, default=None):
-            """Safely get nested list value"""
-            if default is None:
-                default = []
-            value = asset
-            for key in keys:
-                if not isinstance(value, dict):
-                    return default
-                value = value.get(key)
-                if value is None:
-                    return default
-            return value if isinstance(value, list) else default
-        
-        missing_headers = sum([len(safe_get_list(a, 'misconfigurations', 'web_headers', 'missing_headers')) for a in assets])
-        ssl_issues = sum([len(safe_get_list(a, 'misconfigurations', 'ssl', 'issues')) for a in assets])
-        dns_issues = sum([len(safe_get_list(a, 'misconfigurations', 'dns', 'issues')) for a in assets])
-        exposed_buckets = sum([len(safe_get_list(a, 'misconfigurations', 'cloud_buckets', 'buckets')) for a in assets])
-        exposed_files = sum([len(safe_get_list(a, 'misconfigurations', 'security_files', 'sensitive_exposed')) for a in assets])
-        open_dirs = sum([len(safe_get_list(a, 'misconfigurations', 'open_directories', 'open_directories')) for a in assets])
-        total_breaches = sum([a.get('breach_history_count', 0) or 0 for a in assets])
-        
-        summary_data = [
-            ["Metric", "Value"],
-            ["Total Assets", str(total_assets)],
-            ["High/Critical Risk Assets", str(high_risk)],
-            ["Medium Risk Assets", str(medium_risk)],
-            ["Low Risk Assets", str(low_risk)],
-            ["Missing Security Headers", str(missing_headers)],
-            ["SSL/TLS Issues", str(ssl_issues)],
-            ["DNS Misconfigurations", str(dns_issues)],
-            ["Exposed Cloud Storage", str(exposed_buckets)],
-            ["Sensitive Files Exposed", str(exposed_files)],
-            ["Open Directories", str(open_dirs)],
-            ["Historical Data Breaches", str(total_breaches)],
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 12),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
-            ("FONTSIZE", (0, 1), (-1, -1), 10),
-        ]))
-        story.append(summary_table)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Risk Assessment
-        story.append(Paragraph("Risk Assessment", heading_style))
-        risk_text = f"""
-        This security assessment identified <b>{total_assets}</b> assets with varying levels of risk. 
-        <b>{high_risk}</b> assets require immediate attention due to high or critical risk scores. 
-        The scan detected <b>{missing_headers + ssl_issues + dns_issues + exposed_buckets + exposed_files + open_dirs}</b> 
-        total security misconfigurations across all assets.
-        """
-        story.append(Paragraph(risk_text, styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Detailed Asset Findings
-        story.append(PageBreak())
-        story.append(Paragraph("Detailed Asset Findings", heading_style))
-        
-        # Group assets by risk level
-        critical_assets = [a for a in assets if a.get('risk_level') == 'critical']
-        high_assets = [a for a in assets if a.get('risk_level') == 'high']
-        medium_assets = [a for a in assets if a.get('risk_level') == 'medium']
+        # A report downloaded since the user's assets last changed is still
+        # current; skip the aggregation and render entirely
+        etag = _assets_etag(uid, await _latest_asset_update(uid), "detailed-report")
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
         
-        for risk_level, asset_list, title in [
-            ('critical', critical_assets, 'Critical Risk Assets'),
-            ('high', high_assets, 'High Risk Assets'),
-            ('medium', medium_assets, 'Medium Risk Assets')
-        ]:
-            if asset_list:
-                story.append(Paragraph(title, subheading_style))
+        async def build_report() -> bytes:
+            # Totals and the top assets per risk level in one aggregation, so only
+            # the rendered rows are transferred instead of every asset
+            report = (await assets_collection.aggregate(_detailed_report_pipeline(uid)).to_list(length=1))[0]
+            summary = report.pop("summary")
+            logger.info(f"Found {summary[0]['total_assets'] if summary else 0} assets for PDF export")
+            
+            if not summary:
+                logger.warning("No assets found for PDF export")
+                raise HTTPException(status_code=404, detail="No assets found to generate report")
+            
+            # PDF generation (using reportlab)
+            if not REPORTLAB_AVAILABLE:
+                logger.error("reportlab is not installed. Install with 'pip install reportlab'.")
+                raise HTTPException(status_code=500, detail="PDF export requires reportlab. Please install it on the server.")
+            
+            # Render in a worker thread so the event loop keeps serving requests,
+            # sharing the export render cap to bound memory
+            buffer = io.BytesIO()
+            try:
+                async with PDF_RENDER_SEMAPHORE:
+                    await asyncio.to_thread(_render_detailed_pdf, summary[0], report, buffer)
+                pdf_bytes = buffer.getvalue()
+                logger.info(f"PDF generated successfully, size: {len(pdf_bytes)} bytes")
                 
-                asset_data = [["Asset", "Type", "Risk Score", "Issues", "Last Scanned"]]
-                for asset in asset_list[:20]:  # Limit to top 20 per category
-                    misc = asset.get('misconfigurations', {}) or {}
-                    total_issues = misc.get('total_issues', 0)
-                    last_scanned = asset.get('last_scanned_at')
-                    if last_scanned:
-                        if isinstance(last_scanned, str):
-                            last_scanned_str = last_scanned[:10]
-                        else:
-                            # It's a datetime object
-                            last_scanned_str = str(last_scanned)[:10]
-                    else:
-                        last_scanned_str = 'Never'
+                # Validate PDF bytes
+                if len(pdf_bytes) == 0:
+                    raise ValueError("Generated PDF is empty")
+                if not pdf_bytes.startswith(b'%PDF'):
+                    raise ValueError("Generated file does not appear to be a valid PDF")
                     
-                    asset_data.append([
-                        asset.get('asset_value', 'N/A')[:40],
-                        asset.get('asset_type', 'N/A'),
-                        str(asset.get('risk_score', 0)),
-                        str(total_issues),
-                        last_scanned_str
-                    ])
-                
-                asset_table = Table(asset_data, colWidths=[2.5*inch, 1*inch, 0.8*inch, 0.7*inch, 1*inch])
-                asset_table.setStyle(TableStyle([
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                ]))
-                story.append(asset_table)
-                story.append(Spacer(1, 0.3*inch))
-        
-        # Security Misconfigurations Detail
-        story.append(PageBreak())
-        story.append(Paragraph("Security Misconfigurations Detail", heading_style))
-        
-        misconfig_data = [
-            ["Category", "Total Issues", "Affected Assets"]
-        ]
-        
-        # Count affected assets for each category
-        def safe_get_bool(asset, *keys, default=False):
-            """Safely get nested boolean value"""
-            value = asset
-            for key in keys:
-                if not isinstance(value, dict):
-                    return default
-                value = value.get(key)
-                if value is None:
-                    return default
-            return bool(value) if value is not None else default
-        
-        headers_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'web_headers', 'has_issues')])
-        ssl_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'ssl', 'has_issues')])
-        dns_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'dns', 'has_issues')])
-        buckets_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'cloud_buckets', 'has_issues')])
-        files_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'security_files', 'has_issues')])
-        dirs_affected = len([a for a in assets if safe_get_bool(a, 'misconfigurations', 'open_directories', 'has_issues')])
-        
-        misconfig_data.extend([
-            ["Missing Security Headers", str(missing_headers), str(headers_affected)],
-            ["SSL/TLS Certificate Issues", str(ssl_issues), str(ssl_affected)],
-            ["DNS Misconfigurations", str(dns_issues), str(dns_affected)],
-            ["Exposed Cloud Storage", str(exposed_buckets), str(buckets_affected)],
-            ["Sensitive Files Exposed", str(exposed_files), str(files_affected)],
-            ["Open Directory Listings", str(open_dirs), str(dirs_affected)],
-        ])
-        
-        misconfig_table = Table(misconfig_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-        misconfig_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 11),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
-            ("FONTSIZE", (0, 1), (-1, -1), 10),
-        ]))
-        story.append(misconfig_table)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Data Breach Information
-        if total_breaches > 0:
-            story.append(Paragraph("Data Breach History", subheading_style))
-            breach_text = f"""
-            <b>{len([a for a in assets if a.get('breach_history_count', 0) > 0])}</b> assets have been involved in 
-            <b>{total_breaches}</b> known data breaches according to the Have I Been Pwned database. 
-            It is recommended to review security practices and consider password rotation for affected accounts.
-            """
-            story.append(Paragraph(breach_text, styles['Normal']))
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Recommendations Section
-        story.append(PageBreak())
-        story.append(Paragraph("Recommendations", heading_style))
-        
-        recommendations = []
-        if missing_headers > 0:
-            recommendations.append("Implement missing security headers (Content-Security-Policy, X-Frame-Options, etc.) to protect against common web attacks.")
-        if ssl_issues > 0:
-            recommendations.append("Review and renew SSL/TLS certificates. Ensure certificates are valid and not expired.")
-        if dns_issues > 0:
-            recommendations.append("Fix DNS misconfigurations to prevent potential DNS takeover attacks.")
-        if exposed_buckets > 0:
-            recommendations.append("Restrict access to cloud storage buckets. Ensure buckets are not publicly accessible unless necessary.")
-        if exposed_files > 0:
-            recommendations.append("Remove or restrict access to sensitive files (config files, backups, etc.) that are publicly accessible.")
-        if open_dirs > 0:
-            recommendations.append("Disable directory listings to prevent information disclosure.")
-        if total_breaches > 0:
-            recommendations.append("Review breach history and implement password rotation policies for affected accounts.")
-        if high_risk > 0:
-            recommendations.append("Prioritize remediation of high and critical risk assets immediately.")
-        
-        if not recommendations:
-            recommendations.append("No critical security issues detected. Continue monitoring and maintain current security practices.")
-        
-        for i, rec in enumerate(recommendations, 1):
-            story.append(Paragraph(f"{i}. {rec}", styles['Normal']))
-            story.append(Spacer(1, 0.15*inch))
-        
-        # Footer
-        story.append(Spacer(1, 0.5*inch))
-        story.append(Paragraph("This report was generated by RECON-AI Security Platform", 
-                              ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, 
-                                            textColor=colors.grey, alignment=TA_CENTER)))
-        
-        # Build the PDF
-        logger.info("Building PDF document...")
-        try:
-            doc.build(story)
-            buffer.seek(0)  # Reset buffer position to beginning
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            logger.info(f"PDF generated successfully, size: {len(pdf_bytes)} bytes")
+            except Exception as pdf_error:
+                logger.error(f"Error building PDF: {str(pdf_error)}")
+                import traceback
+                logger.error(f"PDF build traceback: {traceback.format_exc()}")
+                raise HTTPException(status_code=500, detail=f"Failed to build PDF: {str(pdf_error)}")
             
-            # Validate PDF bytes
-            if len(pdf_bytes) == 0:
-                raise ValueError("Generated PDF is empty")
-            if not pdf_bytes.startswith(b'%PDF'):
-                raise ValueError("Generated file does not appear to be a valid PDF")
-                
-        except Exception as pdf_error:
-            logger.error(f"Error building PDF: {str(pdf_error)}")
-            import traceback
-            logger.error(f"PDF build traceback: {traceback.format_exc()}")
-            raise HTTPException(status_code=500, detail=f"Failed to build PDF: {str(pdf_error)}")
+            return pdf_bytes
+        
+        # Keyed by the ETag so duplicate clicks or retries while a report is
+        # building wait for that build instead of starting their own
+        pdf_bytes = await cached(f"{uid}:detailed-report:{etag}", PDF_EXPORT_CACHE_TTL, build_report, store=blob_cache)
         
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename=detailed_security_report_{datetime.utcnow().strftime('%Y%m%d')}.pdf",
-                "Content-Length": str(len(pdf_bytes))
+                "ETag": etag,
+                "Cache-Control": ASSETS_CACHE_CONTROL
             },
         )
         
@@ -530,6 +936,123 @@ async def export_detailed_security_report(request: Request):
         raise HTTPException(status_code=500, detail=f"Failed to generate detailed report: {str(e)}")
 
 
+def _csv_export_row(a: dict) -> list:
+    """Build one CSV export row for an asset projected with EXPORT_PROJECTION."""
+    return [
+        a.get("asset_value", ""),
+        a.get("asset_type", ""),
+        a.get("risk_score", 0),
+        a.get("risk_level", ""),
+        a.get("http_status", ""),
+        str(a.get("last_scanned_at", "") or ""),
+        *(a[key] for _, key, _ in EXPORT_ISSUE_COUNTS),
+        a.get("breach_history_count", 0),
+    ]
+
+
+class _Echo:
+    """File-like object whose write returns the value, so csv.writer.writerow yields the row."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+async def _stream_assets_csv(first_batch: list, cursor) -> AsyncIterator[bytes]:
+    """
+    Encode assets as CSV, one row per chunk.
+
+    Rows are written to an _Echo, so each writerow returns its line without
+    any intermediate buffer. The output starts with a UTF-8 BOM for better
+    Excel compatibility. A failure mid-stream propagates so the connection is
+    aborted rather than ending like a complete file.
+
+    Args:
+        first_batch: Assets already fetched before the response started
+        cursor: Cursor positioned after first_batch
+    """
+    writer = csv.writer(_Echo())
+
+    yield ("\ufeff" + writer.writerow(CSV_EXPORT_HEADER)).encode("utf-8")
+
+    for a in first_batch:
+        yield writer.writerow(_csv_export_row(a)).encode("utf-8")
+
+    async for a in cursor:
+        yield writer.writerow(_csv_export_row(a)).encode("utf-8")
+
+
+def _render_summary_pdf(assets: list) -> bytes:
+    """
+    Render the summary PDF export. CPU-bound; run it off the event loop.
+
+    Args:
+        assets: Assets projected with EXPORT_PROJECTION, highest risk first
+
+    Returns:
+        PDF document bytes
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = PDF_STYLES
+    story = []
+
+    # Title
+    story.append(Paragraph("RECON-AI Summary Report", styles["Title"]))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph("Discovered Assets, Security Misconfigurations, and Data Breaches", styles["Heading2"]))
+    story.append(Spacer(1, 12))
+
+    # SME-friendly vulnerability terms section
+    story.append(Paragraph("Easy Terms (for SMEs)", styles["Heading3"]))
+    terms_table = Table(SIMPLE_TERMS_ROWS, hAlign="LEFT")
+    terms_table.setStyle(TERMS_TABLE_STYLE)
+    story.append(terms_table)
+    story.append(Spacer(1, 16))
+
+    # Discovered Assets table (top 25 for brevity)
+    story.append(Paragraph("Discovered Assets", styles["Heading3"]))
+    asset_rows = [[
+        "Asset", "Type", "Risk", "Level", "HTTP", "Last Scanned"
+    ]]
+    for a in assets[:25]:
+        asset_rows.append([
+            a.get("asset_value", ""),
+            a.get("asset_type", ""),
+            str(a.get("risk_score", 0)),
+            a.get("risk_level", "").title(),
+            str(a.get("http_status", "")),
+            str(a.get("last_scanned_at", "")),
+        ])
+    assets_table = Table(asset_rows, hAlign="LEFT")
+    assets_table.setStyle(ASSETS_TABLE_STYLE)
+    story.append(assets_table)
+    story.append(Spacer(1, 16))
+
+    # Security Misconfigurations summary
+    story.append(Paragraph("Security Misconfigurations (Summary)", styles["Heading3"]))
+    # Totals in a single pass over the precomputed per-asset counts
+    issue_totals = dict.fromkeys((key for _, key, _ in EXPORT_ISSUE_COUNTS), 0)
+    total_breaches = 0
+    for a in assets:
+        for key in issue_totals:
+            issue_totals[key] += a[key]
+        total_breaches += a.get("breach_history_count", 0) or 0
+
+    mis_rows = [[label, str(issue_totals[key])] for label, key, _ in EXPORT_ISSUE_COUNTS]
+    mis_table = Table([["Category", "Total Issues"]] + mis_rows, hAlign="LEFT")
+    mis_table.setStyle(MISCONFIGURATION_TABLE_STYLE)
+    story.append(mis_table)
+    story.append(Spacer(1, 16))
+
+    # Data Breaches summary
+    story.append(Paragraph("Data Breaches", styles["Heading3"]))
+    story.append(Paragraph(f"Total breaches detected across assets: <b>{total_breaches}</b>", styles["BodyText"]))
+
+    # Build the PDF
+    doc.build(story)
+    return buffer.getvalue()
+
+
 @router.get("/export")
 async def export_assets(
     request: Request,
@@ -547,180 +1070,64 @@ async def export_assets(
     try:
         assets_collection = get_collection("assets")
 
-        # Fetch all assets for the user
-        assets = await assets_collection.find({"user_id": uid}).sort("risk_score", -1).to_list(length=None)
-        for asset in assets:
-            asset.pop("_id", None)
+        # An export unchanged since the last download needs no DB work
+        etag = _assets_etag(uid, await _latest_asset_update(uid), "export", format)
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        cache_headers = {"ETag": etag, "Cache-Control": ASSETS_CACHE_CONTROL}
+
+        # Only the exported fields, with issue counts sized server-side
+        export_pipeline = [
+            {"$match": {"user_id": uid}},
+            {"$sort": {"risk_score": -1}},
+            {"$project": EXPORT_PROJECTION},
+        ]
 
         if format == "csv":
-            output_text = io.StringIO()
-            writer = csv.writer(output_text)
-
-            # CSV header
-            writer.writerow([
-                "Asset",
-                "Type",
-                "Risk Score",
-                "Risk Level",
-                "HTTP Status",
-                "Last Scanned",
-                "Missing Headers Count",
-                "SSL Issues Count",
-                "DNS Issues Count",
-                "Cloud Buckets Exposed",
-                "Sensitive Files Exposed",
-                "Open Directories",
-                "Breach History Count"
-            ])
-
-            for a in assets:
-                misc = a.get("misconfigurations", {}) or {}
-                writer.writerow([
-                    a.get("asset_value", ""),
-                    a.get("asset_type", ""),
-                    a.get("risk_score", 0),
-                    a.get("risk_level", ""),
-                    a.get("http_status", ""),
-                    str(a.get("last_scanned_at", "") or ""),
-                    len((misc.get("web_headers", {}) or {}).get("missing_headers", []) or []),
-                    len((misc.get("ssl", {}) or {}).get("issues", []) or []),
-                    len((misc.get("dns", {}) or {}).get("issues", []) or []),
-                    len((misc.get("cloud_buckets", {}) or {}).get("buckets", []) or []),
-                    len((misc.get("security_files", {}) or {}).get("sensitive_exposed", []) or []),
-                    len((misc.get("open_directories", {}) or {}).get("open_directories", []) or []),
-                    a.get("breach_history_count", 0),
-                ])
+            # Stream rows straight from the cursor instead of buffering the export.
+            # The first batch is fetched up front so query errors still return a 500
+            cursor = assets_collection.aggregate(export_pipeline, batchSize=EXPORT_BATCH_SIZE)
+            first_batch = await cursor.to_list(length=EXPORT_BATCH_SIZE)
 
-            # Encode as UTF-8 with BOM for better Excel compatibility
-            csv_bytes = ("\ufeff" + output_text.getvalue()).encode("utf-8")
-            
-            return Response(
-                content=csv_bytes,
+            return StreamingResponse(
+                _stream_assets_csv(first_batch, cursor),
                 media_type="text/csv; charset=utf-8",
                 headers={
-                    "Content-Disposition": "attachment; filename=assets_export.csv"
+                    "Content-Disposition": "attachment; filename=assets_export.csv",
+                    **cache_headers
                 },
             )
 
         # PDF generation (using reportlab)
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        except ImportError:
+        if not REPORTLAB_AVAILABLE:
             logger.error("reportlab is not installed. Install with 'pip install reportlab'.")
             raise HTTPException(status_code=500, detail="PDF export requires reportlab. Please install it on the server.")
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Title
-        story.append(Paragraph("RECON-AI Summary Report", styles["Title"]))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph("Discovered Assets, Security Misconfigurations, and Data Breaches", styles["Heading2"]))
-        story.append(Spacer(1, 12))
-
-        # SME-friendly vulnerability terms section
-        simple_terms = [
-            ["Phishing", "Fake Message"],
-            ["Smishing", "Fake SMS"],
-            ["Vishing", "Fake Call"],
-            ["Whaling", "Boss Scam"],
-            ["Baiting", "Free Trap"],
-            ["Malware", "Harmful File"],
-            ["Ransomware", "Lock Attack"],
-            ["Data Leak", "Info Spill"],
-            ["Weak Passwords", "Easy Login"],
-        ]
+        async def build_pdf() -> bytes:
+            # Fetch all assets for the user
+            assets = await assets_collection.aggregate(export_pipeline, batchSize=EXPORT_BATCH_SIZE).to_list(length=None)
 
-        story.append(Paragraph("Easy Terms (for SMEs)", styles["Heading3"]))
-        terms_table = Table([["Technical", "Simple Term"]] + simple_terms, hAlign="LEFT")
-        terms_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f3f4f6")),
-        ]))
-        story.append(terms_table)
-        story.append(Spacer(1, 16))
-
-        # Discovered Assets table (top 25 for brevity)
-        story.append(Paragraph("Discovered Assets", styles["Heading3"]))
-        asset_rows = [[
-            "Asset", "Type", "Risk", "Level", "HTTP", "Last Scanned"
-        ]]
-        for a in assets[:25]:
-            asset_rows.append([
-                a.get("asset_value", ""),
-                a.get("asset_type", ""),
-                str(a.get("risk_score", 0)),
-                a.get("risk_level", "").title(),
-                str(a.get("http_status", "")),
-                str(a.get("last_scanned_at", "")),
-            ])
-        assets_table = Table(asset_rows, hAlign="LEFT")
-        assets_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        story.append(assets_table)
-        story.append(Spacer(1, 16))
-
-        # Security Misconfigurations summary
-        story.append(Paragraph("Security Misconfigurations (Summary)", styles["Heading3"]))
-        def count_total(items):
-            return sum(items)
-
-        missing_headers = [len((a.get("misconfigurations", {}) or {}).get("web_headers", {}).get("missing_headers", []) or []) for a in assets]
-        ssl_issues = [len((a.get("misconfigurations", {}) or {}).get("ssl", {}).get("issues", []) or []) for a in assets]
-        dns_issues = [len((a.get("misconfigurations", {}) or {}).get("dns", {}).get("issues", []) or []) for a in assets]
-        bucket_exposed = [len((a.get("misconfigurations", {}) or {}).get("cloud_buckets", {}).get("buckets", []) or []) for a in assets]
-        sensitive_files = [len((a.get("misconfigurations", {}) or {}).get("security_files", {}).get("sensitive_exposed", []) or []) for a in assets]
-        open_dirs = [len((a.get("misconfigurations", {}) or {}).get("open_directories", {}).get("open_directories", []) or []) for a in assets]
-
-        mis_rows = [
-            ["Missing Security Headers", str(count_total(missing_headers))],
-            ["SSL/TLS Issues", str(count_total(ssl_issues))],
-            ["DNS Misconfigurations", str(count_total(dns_issues))],
-            ["Exposed Cloud Storage", str(count_total(bucket_exposed))],
-            ["Exposed Sensitive Files", str(count_total(sensitive_files))],
-            ["Open Directory Listings", str(count_total(open_dirs))],
-        ]
-        mis_table = Table([["Category", "Total Issues"]] + mis_rows, hAlign="LEFT")
-        mis_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f3f4f6")),
-        ]))
-        story.append(mis_table)
-        story.append(Spacer(1, 16))
-
-        # Data Breaches summary
-        story.append(Paragraph("Data Breaches", styles["Heading3"]))
-        total_breaches = sum([a.get("breach_history_count", 0) or 0 for a in assets])
-        story.append(Paragraph(f"Total breaches detected across assets: <b>{total_breaches}</b>", styles["BodyText"]))
-
-        # Build the PDF
-        doc.build(story)
-        pdf_bytes = buffer.getvalue()
+            # Render in a worker thread so the event loop keeps serving requests,
+            # capping concurrent renders to bound memory
+            async with PDF_RENDER_SEMAPHORE:
+                return await asyncio.to_thread(_render_summary_pdf, assets)
+
+        # Keyed by the ETag so concurrent or repeated exports of the same asset
+        # state share one fetch and render
+        pdf_bytes = await cached(f"{uid}:export-pdf:{etag}", PDF_EXPORT_CACHE_TTL, build_pdf, store=blob_cache)
 
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": "attachment; filename=assets_report.pdf"
+                "Content-Disposition": "attachment; filename=assets_report.pdf",
+                **cache_headers
             },
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to export assets: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to export report")
@@ -738,6 +1145,9 @@ async def clear_all_assets(request: Request):
 
         # Delete all assets for this user
         result = await assets_collection.delete_many({"user_id": uid})
+
+        # Stored analytics no longer reflect the user's assets
+        await clear_user_summary(uid)
         
         logger.info(f"Cleared {result.deleted_count} assets for user {uid}")
 
@@ -754,7 +1164,7 @@ async def clear_all_assets(request: Request):
 
 
 @router.get("/{asset_id}")
-async def get_asset_details(request: Request, asset_id: str):
+async def get_asset_details(request: Request, response: Response, asset_id: str):
     """
     Get detailed information for a single asset.
     """
@@ -764,15 +1174,20 @@ async def get_asset_details(request: Request, asset_id: str):
     try:
         assets_collection = get_collection("assets")
 
-        asset = await assets_collection.find_one({
-            "asset_id": asset_id,
-            "user_id": uid
-        })
+        asset = await assets_collection.find_one(
+            {"asset_id": asset_id, "user_id": uid},
+            projection={"_id": 0}
+        )
 
         if not asset:
             raise HTTPException(status_code=404, detail="Asset not found")
 
-        asset.pop("_id", None)
+        etag = f'W/"{hashlib.sha1(repr((asset_id, asset.get("updated_at"))).encode("utf-8")).hexdigest()}"'
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = ASSETS_CACHE_CONTROL
 
         return {"data": {"asset": asset}}
 
@@ -804,29 +1219,17 @@ async def get_misconfiguration_recommendation(
     try:
         assets_collection = get_collection("assets")
         
-        # Try to find asset by asset_id first
-        asset = await assets_collection.find_one({
-            "asset_id": recommendation_request.asset_id,
-            "user_id": user["uid"]
-        })
+        # Match by asset_id, by asset_value (older assets without asset_id) or by
+        # _id when the ID looks like an ObjectId, in a single round trip
+        requested_id = recommendation_request.asset_id
+        id_clauses = [{"asset_id": requested_id}, {"asset_value": requested_id}]
+        if ObjectId.is_valid(requested_id):
+            id_clauses.append({"_id": ObjectId(requested_id)})
         
-        # If not found by asset_id, try finding by asset_value (for older assets without asset_id)
-        if not asset:
-            asset = await assets_collection.find_one({
-                "asset_value": recommendation_request.asset_id,
-                "user_id": user["uid"]
-            })
-        
-        # If still not found, try _id if it looks like MongoDB ObjectId
-        if not asset:
-            try:
-                from bson import ObjectId
-                asset = await assets_collection.find_one({
-                    "_id": ObjectId(recommendation_request.asset_id),
-                    "user_id": user["uid"]
-                })
-            except Exception:
-                pass
+        asset = await assets_collection.find_one(
+            {"user_id": user["uid"], "$or": id_clauses},
+            projection={"_id": 0, "asset_value": 1, "misconfigurations": 1}
+        )
         
         if not asset:
             logger.warning(f"Asset not found: asset_id={recommendation_request.asset_id}, user_id={user['uid']}")
@@ -906,8 +1309,15 @@ async def get_summary_recommendation(
             query["domain"] = recommendation_request.domain
         
         # Get all assets for the user (or filtered by domain)
-        assets_cursor = assets_collection.find(query)
-        assets = await assets_cursor.to_list(length=1000)  # Limit to prevent memory issues
+        # Capped server-side so Mongo closes the cursor instead of leaving it
+        # open past the rows we read
+        assets_cursor = assets_collection.find(
+            query,
+            projection=RECOMMENDATION_ASSET_PROJECTION,
+            limit=RECOMMENDATION_ASSET_LIMIT,
+            batch_size=RECOMMENDATION_ASSET_LIMIT
+        )
+        assets = await assets_cursor.to_list(length=None)
         
         if not assets:
             return {
@@ -916,10 +1326,6 @@ async def get_summary_recommendation(
                 }
             }
         
-        # Remove MongoDB _id fields
-        for asset in assets:
-            asset.pop("_id", None)
-        
         # Generate AI recommendation
         recommendation = await generate_summary_report_recommendations(assets=assets)
         
@@ -962,8 +1368,15 @@ async def get_security_terms(
             query["domain"] = recommendation_request.domain
         
         # Get all assets for the user (or filtered by domain)
-        assets_cursor = assets_collection.find(query)
-        assets = await assets_cursor.to_list(length=1000)  # Limit to prevent memory issues
+        # Capped server-side so Mongo closes the cursor instead of leaving it
+        # open past the rows we read
+        assets_cursor = assets_collection.find(
+            query,
+            projection=RECOMMENDATION_ASSET_PROJECTION,
+            limit=RECOMMENDATION_ASSET_LIMIT,
+            batch_size=RECOMMENDATION_ASSET_LIMIT
+        )
+        assets = await assets_cursor.to_list(length=None)
         
         if not assets:
             return {
@@ -972,10 +1385,6 @@ async def get_security_terms(
                 }
             }
         
-        # Remove MongoDB _id fields
-        for asset in assets:
-            asset.pop("_id", None)
-        
         # Generate AI terms
         terms = await generate_security_terms(assets=assets)
         
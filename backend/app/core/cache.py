@@ -0,0 +1,164 @@
+"""
+In-process TTL cache for per-user API responses.
+
+Provides a small async cache with per-key locks so concurrent requests
+for the same key share a single rebuild instead of stampeding the database.
+
+Entries live in separate LRU stores so short-lived bulky values (rendered
+PDFs, serialized pages) never push out small or expensive ones (analytics
+payloads, LLM completions). Expired entries are dropped lazily when read
+or when they reach the least recently used end of their store.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached entries in the default response store
+MAX_ENTRIES = 10000
+
+# Byte budget and entry cap for rendered documents and serialized pages
+BLOB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+BLOB_CACHE_MAX_ENTRIES = 1000
+
+# Upper bound on cached LLM completions
+COMPLETION_CACHE_MAX_ENTRIES = 2000
+
+
+def _value_size(value: Any) -> int:
+    """Bytes counted against a store's byte budget (only bytes/str are sized)."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return 0
+
+
+class _TTLStore:
+    """LRU store of (expires_at, size, value) entries with optional byte budget."""
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value), dropping the entry if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            self.pop(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[2]
+
+    def set(self, key: str, ttl: float, value: Any) -> None:
+        """Store a value, evicting least recently used entries over the limits."""
+        self.pop(key)
+        size = _value_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size} bytes exceeds the store budget")
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or \
+                (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def pop(self, key: str) -> None:
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def keys(self) -> list:
+        """Snapshot of the stored keys, least recently used first."""
+        return list(self._entries)
+
+
+# Analytics payloads, summaries, counts
+response_cache = _TTLStore(MAX_ENTRIES)
+# Rendered PDFs and serialized asset pages
+blob_cache = _TTLStore(BLOB_CACHE_MAX_ENTRIES, BLOB_CACHE_MAX_BYTES)
+# LLM completions, keyed by prompt hash
+completion_cache = _TTLStore(COMPLETION_CACHE_MAX_ENTRIES)
+
+_STORES = (response_cache, blob_cache, completion_cache)
+
+# Rebuild locks by key, with the number of requests holding or awaiting each
+_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+async def cached(
+    key: str,
+    ttl: float,
+    factory: Callable[[], Awaitable[Any]],
+    store: _TTLStore = response_cache,
+) -> Any:
+    """
+    Return the cached value for key, building it with factory on a miss.
+
+    Args:
+        key: Cache key (prefix with the user ID so it can be invalidated)
+        ttl: Time to live in seconds
+        factory: Zero-argument coroutine function producing the value
+        store: Store holding the entry (blob_cache for large bytes values,
+            completion_cache for LLM output)
+
+    Returns:
+        Cached or freshly built value
+    """
+    hit, value = store.get(key)
+    if hit:
+        return value
+
+    lock, users = _locks.get(key, (None, 0))
+    if lock is None:
+        lock = asyncio.Lock()
+    _locks[key] = (lock, users + 1)
+
+    try:
+        async with lock:
+            # Another request may have rebuilt the entry while we waited
+            hit, value = store.get(key)
+            if hit:
+                return value
+
+            value = await factory()
+            store.set(key, ttl, value)
+            return value
+    finally:
+        lock, users = _locks[key]
+        if users == 1:
+            del _locks[key]
+        else:
+            _locks[key] = (lock, users - 1)
+
+
+def invalidate_prefix(prefix: str) -> None:
+    """
+    Drop every cached entry whose key starts with prefix.
+
+    Args:
+        prefix: Key prefix, e.g. "<uid>:" for all of a user's entries
+    """
+    for store in _STORES:
+        for key in [k for k in store.keys() if k.startswith(prefix)]:
+            store.pop(key)
+
+
+def invalidate_user(uid: str) -> None:
+    """
+    Drop all cached entries for a user.
+
+    Args:
+        uid: User ID (Firebase UID)
+    """
+    invalidate_prefix(f"{uid}:")
@@ -34,9 +34,11 @@ async def connect_to_mongodb() -> None:
         raise ValueError("MONGO_URI environment variable is not set")
 
     try:
+        # Analytics handlers fan out several queries concurrently per request,
+        # so the pool must be sized well above the number of in-flight requests
         _mongo_client = AsyncIOMotorClient(
             mongo_uri,
-            maxPoolSize=10,
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
             minPoolSize=1,
             serverSelectionTimeoutMS=5000,
         )
@@ -53,6 +55,7 @@ async def connect_to_mongodb() -> None:
 
         # Create indexes
         await create_indexes()
+        await backfill_asset_search_field()
 
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {str(e)}")
@@ -74,10 +77,14 @@ async def create_indexes() -> None:
 
     Creates indexes on:
     - users: uid (unique), email (unique), stripe_customer_id
-    - assets: user_id + asset_value (compound unique), next_scan_at, risk_score
-    - scans: asset_id + created_at (compound), user_id, scan_status
+    - assets: user_id + asset_value (compound unique), next_scan_at, risk_score,
+      user_id + risk_score / discovered_at / updated_at / asset_value_lc / asset_id,
+      user_id + risk_level / asset_type + risk_score (compound)
+    - scans: asset_id + created_at (compound), scan_id (unique), user_id, scan_status,
+      user_id + scan_status + completed_at (compound)
     - billing_events: user_id + created_at, stripe_event_id (unique)
     - api_usage_logs: user_id + timestamp, timestamp (TTL 90 days)
+    - user_analytics_summary: user_id (unique)
     """
     db = get_database()
 
@@ -94,11 +101,24 @@ async def create_indexes() -> None:
         await db.assets.create_index("next_scan_at")  # For scheduler queries
         await db.assets.create_index("asset_type")
 
+        # Compound indexes for per-user filters, sorts and date windows; the
+        # trailing _id matches the asset listing's tie-breaker so filtered and
+        # keyset-paginated listings are served in index order
+        await db.assets.create_index([("user_id", 1), ("risk_score", -1), ("_id", -1)])
+        await db.assets.create_index([("user_id", 1), ("discovered_at", -1), ("_id", -1)])
+        await db.assets.create_index([("user_id", 1), ("risk_level", 1), ("risk_score", -1), ("_id", -1)])
+        await db.assets.create_index([("user_id", 1), ("asset_type", 1), ("risk_score", -1), ("_id", -1)])
+        await db.assets.create_index([("user_id", 1), ("updated_at", -1)])  # Asset ETags
+        await db.assets.create_index([("user_id", 1), ("asset_value_lc", 1)])  # Asset search
+        await db.assets.create_index([("user_id", 1), ("asset_id", 1)])  # Asset lookups by ID
+
         # Scans collection indexes
         await db.scans.create_index([("asset_id", 1), ("created_at", -1)])
+        await _create_unique_scan_id_index(db)
         await db.scans.create_index("user_id")
         await db.scans.create_index("scan_status")
         await db.scans.create_index([("created_at", -1)])
+        await db.scans.create_index([("user_id", 1), ("scan_status", 1), ("completed_at", -1)])
 
         # Billing events collection indexes
         await db.billing_events.create_index([("user_id", 1), ("created_at", -1)])
@@ -111,6 +131,9 @@ async def create_indexes() -> None:
             expireAfterSeconds=7776000  # 90 days in seconds
         )
 
+        # Analytics summary collection indexes
+        await db.user_analytics_summary.create_index("user_id", unique=True)
+
         logger.info("Database indexes created successfully")
 
     except Exception as e:
@@ -118,6 +141,51 @@ async def create_indexes() -> None:
         # Don't raise - indexes might already exist
 
 
+async def _create_unique_scan_id_index(db: AsyncIOMotorDatabase) -> None:
+    """
+    Create the unique scan_id index, replacing an older non-unique one.
+
+    Runs in its own try so a conflict (e.g. duplicate legacy scan IDs) is
+    logged without skipping the remaining indexes.
+    """
+    try:
+        existing = (await db.scans.index_information()).get("scan_id_1")
+        if existing and not existing.get("unique"):
+            await db.scans.drop_index("scan_id_1")
+            logger.info("Dropped non-unique scan_id index")
+
+        await db.scans.create_index("scan_id", unique=True)
+
+    except Exception as e:
+        logger.error(f"Error creating unique scan_id index: {str(e)}")
+        # Keep scan_id lookups indexed until the duplicates are cleaned up
+        try:
+            await db.scans.create_index("scan_id")
+        except Exception as e:
+            logger.error(f"Error creating scan_id index: {str(e)}")
+
+
+async def backfill_asset_search_field() -> None:
+    """
+    Populate asset_value_lc on assets saved before the field existed.
+
+    Scans write the lowercased asset value alongside the original; this
+    catches up older documents so they stay visible to asset search.
+    """
+    db = get_database()
+
+    try:
+        result = await db.assets.update_many(
+            {"asset_value_lc": {"$exists": False}},
+            [{"$set": {"asset_value_lc": {"$toLower": "$asset_value"}}}]
+        )
+        if result.modified_count:
+            logger.info(f"Backfilled asset_value_lc on {result.modified_count} assets")
+
+    except Exception as e:
+        logger.error(f"Error backfilling asset search field: {str(e)}")
+
+
 def get_database() -> AsyncIOMotorDatabase:
     """
     Get the MongoDB database instance.
@@ -152,6 +220,7 @@ def get_collection(collection_name: str):
     - scans
     - billing_events
     - api_usage_logs
+    - user_analytics_summary
     """
     db = get_database()
     return db[collection_name]
@@ -6,8 +6,11 @@ from environment variables and provides token verification functionality.
 """
 
 import os
+import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException
@@ -17,6 +20,14 @@ logger = logging.getLogger(__name__)
 # Global Firebase app instance
 _firebase_app: Optional[firebase_admin.App] = None
 
+# Verified tokens are reused for at most this long, and never past their exp
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
+# Token digest -> (expires_at wall-clock timestamp, user info)
+_token_cache: Dict[bytes, Tuple[float, Dict]] = {}
+_token_locks: Dict[bytes, asyncio.Lock] = {}
+
 
 def initialize_firebase() -> None:
     """
@@ -102,9 +113,58 @@ async def verify_firebase_token(token: str) -> Dict:
             detail="No authentication token provided"
         )
 
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    # Callers get their own copy so changes never leak into the cache
+    entry = _token_cache.get(key)
+    if entry and entry[0] > time.time():
+        return dict(entry[1])
+
+    lock = _token_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            # Another request may have verified the same token while we waited
+            entry = _token_cache.get(key)
+            if entry and entry[0] > time.time():
+                return dict(entry[1])
+
+            user_info, expires_at = await _verify_token_uncached(token)
+
+            if len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+                _evict_tokens()
+            _token_cache[key] = (expires_at, dict(user_info))
+            return user_info
+    finally:
+        if not lock.locked():
+            _token_locks.pop(key, None)
+
+
+def _evict_tokens() -> None:
+    """Drop expired tokens, then the oldest ones if still over capacity."""
+    now = time.time()
+    for key in [k for k, (expires_at, _) in _token_cache.items() if expires_at <= now]:
+        _token_cache.pop(key, None)
+
+    while len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.pop(next(iter(_token_cache)))
+
+
+async def _verify_token_uncached(token: str) -> Tuple[Dict, float]:
+    """
+    Verify a token with the Firebase Admin SDK.
+
+    Returns:
+        Tuple of (user info, time until which the result may be reused)
+
+    Raises:
+        HTTPException: 401 if token is invalid or expired
+    """
     try:
-        # Verify the ID token
-        decoded_token = auth.verify_id_token(token, clock_skew_seconds=60)
+        # Signature checks and certificate refreshes are blocking, so keep
+        # them off the event loop
+        decoded_token = await asyncio.to_thread(
+            auth.verify_id_token, token, clock_skew_seconds=60
+        )
 
         # Extract user information
         user_info = {
@@ -116,7 +176,8 @@ async def verify_firebase_token(token: str) -> Dict:
         }
 
         logger.debug(f"Token verified successfully for user: {user_info['uid']}")
-        return user_info
+        expires_at = min(time.time() + TOKEN_CACHE_TTL, float(decoded_token.get("exp", 0)))
+        return user_info, expires_at
 
     except auth.InvalidIdTokenError as e:
         logger.warning(f"Invalid Firebase ID token: {str(e)}")
@@ -10,13 +10,15 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 
 from app.core.firebase import initialize_firebase
 from app.core.database import connect_to_mongodb, close_mongodb_connection, check_database_health
 from app.middleware.auth import FirebaseAuthMiddleware
 from app.services.groq_service import initialize_groq
+from app.tasks.scan_queue import start_scan_workers
 from app.api.routes import auth, assets, analytics, billing
 
 # Load environment variables
@@ -36,8 +38,8 @@ async def lifespan(app: FastAPI):
     Application lifespan context manager.
 
     Handles startup and shutdown events:
-    - Startup: Initialize Firebase, MongoDB
-    - Shutdown: Close database connections
+    - Startup: Initialize Firebase, MongoDB, scan workers
+    - Shutdown: Stop scan workers, close database connections
     """
     # Startup
     logger.info("Starting ReconAI Backend...")
@@ -55,6 +57,10 @@ async def lifespan(app: FastAPI):
         await connect_to_mongodb()
         logger.info("✓ MongoDB connected")
 
+        # Start the scan worker pool and re-queue interrupted scans
+        scan_worker_tasks = await start_scan_workers()
+        logger.info("✓ Scan workers started")
+
         logger.info("ReconAI Backend started successfully")
 
     except Exception as e:
@@ -67,6 +73,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down ReconAI Backend...")
 
     try:
+        for task in scan_worker_tasks:
+            task.cancel()
         await close_mongodb_connection()
         logger.info("All connections closed successfully")
 
@@ -81,6 +89,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # Serialize route responses with orjson instead of the stdlib encoder
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -100,6 +110,10 @@ app.add_middleware(
 # Add Firebase authentication middleware
 app.add_middleware(FirebaseAuthMiddleware)
 
+# Compress larger responses (dashboard payloads, asset lists, streamed CSV
+# exports); a mid compression level keeps CPU low for large exports
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(assets.router)
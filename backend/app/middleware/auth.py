@@ -199,3 +199,27 @@ def get_current_user(request: Request) -> dict:
         )
 
     return request.state.user
+
+
+async def get_current_uid(request: Request) -> str:
+    """
+    FastAPI dependency returning the authenticated user's UID.
+
+    Declared async so FastAPI resolves it on the event loop instead of a
+    worker thread, and caches it once per request for all dependants.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        Firebase UID of the authenticated user
+
+    Raises:
+        HTTPException: 401 if user is not authenticated
+
+    Usage in route handlers:
+        @router.get("/api/protected-route")
+        async def protected_route(uid: str = Depends(get_current_uid)):
+            return {"user_id": uid}
+    """
+    return get_current_user(request)["uid"]
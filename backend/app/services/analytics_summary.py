@@ -0,0 +1,355 @@
+"""
+Analytics Summary Service
+
+Maintains a per-user materialized summary of asset and scan statistics
+so analytics endpoints can be served from a single document lookup
+instead of re-aggregating the assets collection on every request.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from app.core.cache import cached, invalidate_user
+from app.core.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLLECTION = "user_analytics_summary"
+
+# Bump when the stored summary shape changes so older documents are recomputed
+SUMMARY_VERSION = 4
+
+# Summaries older than this are recomputed on read (7-day windows drift)
+SUMMARY_MAX_AGE = timedelta(minutes=10)
+
+# Seconds a loaded summary is memoized in-process and shared across endpoints
+SUMMARY_CACHE_TTL = 60
+
+DB_PORTS = [3306, 5432, 27017, 6379]
+
+# Lower bound of each risk_score bucket and its level (matches ml.predict.get_risk_level)
+RISK_BUCKETS = {0: "low", 31: "medium", 61: "high", 86: "critical"}
+RISK_BUCKET_BOUNDARIES = list(RISK_BUCKETS) + [101]
+
+# Risk factor labels and the summary field holding their asset count
+RISK_FACTORS = [
+    ("SSH Exposed", "ssh_count"),
+    ("Database Exposed", "db_count"),
+    ("Outdated Software", "outdated_count"),
+    ("Invalid SSL", "invalid_ssl"),
+    ("Missing Security Headers", "missing_headers"),
+    ("SSL/TLS Issues", "ssl_issues"),
+    ("DNS Misconfigurations", "dns_issues"),
+    ("Exposed Cloud Storage", "cloud_buckets"),
+    ("Exposed Sensitive Files", "sensitive_files"),
+    ("Open Directories", "open_dirs"),
+    ("Breach History", "breach_count"),
+]
+
+# Number of risk factors reported, highest share first
+TOP_RISK_FACTORS = 8
+
+
+def _before(field: str, value) -> Dict:
+    """Expression for field < value that, like a query filter, skips missing/null fields."""
+    return {"$and": [{"$gt": [field, None]}, {"$lt": [field, value]}]}
+
+
+def _flag_set(field: str) -> Dict:
+    """Expression for a misconfiguration has_issues flag being True."""
+    return {"$eq": [field, True]}
+
+
+def _asset_count_expressions(seven_days_ago: datetime) -> Dict[str, Dict]:
+    """
+    Build the per-statistic asset predicates counted in the summary.
+
+    Predicates are aggregation expressions so every count is evaluated
+    inline in a single $group pass over the user's assets.
+
+    Args:
+        seven_days_ago: Start of the recent-discovery window
+
+    Returns:
+        Dict mapping summary field name to a boolean expression
+    """
+    # $in and $setIntersection reject anything but an array, so a missing or
+    # malformed open_ports field counts as no open ports
+    open_ports = {"$cond": [{"$isArray": "$open_ports"}, "$open_ports", []]}
+    invalid_ssl = {"$eq": ["$ssl_cert_valid", False]}
+    ssl_issues = _flag_set("$misconfigurations.ssl.has_issues")
+
+    return {
+        "assets_7d_ago": _before("$discovered_at", seven_days_ago),
+        "new_critical_7d": {
+            "$and": [
+                {"$gte": ["$risk_score", 86]},
+                {"$gte": ["$discovered_at", seven_days_ago]}
+            ]
+        },
+        "high_risk_count": {"$gte": ["$risk_score", 70]},
+        "ssh_count": {"$in": [22, open_ports]},
+        "db_count": {"$gt": [{"$size": {"$setIntersection": [open_ports, DB_PORTS]}}, 0]},
+        "outdated_count": {"$gt": ["$outdated_software_count", 0]},
+        "invalid_ssl": invalid_ssl,
+        "ssl_issues": ssl_issues,
+        # Assets with either certificate or TLS configuration problems
+        "ssl_problems": {"$or": [invalid_ssl, ssl_issues]},
+        "missing_headers": {
+            "$or": [
+                _before("$http_security_headers_score", 3),
+                _flag_set("$misconfigurations.web_headers.has_issues")
+            ]
+        },
+        "dns_issues": _flag_set("$misconfigurations.dns.has_issues"),
+        "cloud_buckets": _flag_set("$misconfigurations.cloud_buckets.has_issues"),
+        "sensitive_files": _flag_set("$misconfigurations.security_files.has_issues"),
+        "open_dirs": _flag_set("$misconfigurations.open_directories.has_issues"),
+        "breach_count": {"$gt": ["$breach_history_count", 0]},
+    }
+
+
+def _rank_risk_factors(counts: Dict[str, int], total_assets: int) -> List[Dict]:
+    """
+    Build the top risk factors sorted by share of affected assets.
+
+    Args:
+        counts: Summary counts keyed by field name
+        total_assets: Total number of assets for the user
+
+    Returns:
+        Up to TOP_RISK_FACTORS factor dicts with name, count and percentage
+    """
+    if total_assets == 0:
+        return []
+
+    factors = [
+        {
+            "name": name,
+            "count": counts[key],
+            "percentage": round((counts[key] / total_assets) * 100, 1)
+        }
+        for name, key in RISK_FACTORS
+        if counts[key] > 0
+    ]
+    factors.sort(key=itemgetter("count"), reverse=True)
+
+    return factors[:TOP_RISK_FACTORS]
+
+
+def _facet_count(facets: Dict, key: str) -> int:
+    """Extract a {"$count": "n"} facet branch result, defaulting to 0."""
+    branch = facets.get(key)
+    return branch[0]["n"] if branch else 0
+
+
+async def compute_user_summary(uid: str) -> Dict:
+    """
+    Compute the analytics summary for a user from live data.
+
+    Args:
+        uid: User ID (Firebase UID)
+
+    Returns:
+        Summary dict with precomputed counts and averages
+    """
+    assets_collection = get_collection("assets")
+    scans_collection = get_collection("scans")
+
+    now = datetime.utcnow()
+    seven_days_ago = now - timedelta(days=7)
+    fourteen_days_ago = now - timedelta(days=14)
+
+    # Every asset statistic is computed in one $facet pass over the user's assets
+    count_expressions = _asset_count_expressions(seven_days_ago)
+    asset_pipeline = [
+        {"$match": {"user_id": uid}},
+        {
+            "$facet": {
+                # Bucket on risk_score so counts never drift from the stored risk_level
+                "by_risk": [
+                    {
+                        "$bucket": {
+                            "groupBy": "$risk_score",
+                            "boundaries": RISK_BUCKET_BOUNDARIES,
+                            "default": "other",
+                            # scored counts the documents $avg actually averaged
+                            "output": {
+                                "n": {"$sum": 1},
+                                "scored": {"$sum": {"$cond": [{"$isNumber": "$risk_score"}, 1, 0]}},
+                                "avg": {"$avg": "$risk_score"}
+                            }
+                        }
+                    }
+                ],
+                "old_avg": [
+                    {"$match": {"discovered_at": {"$gte": fourteen_days_ago, "$lt": seven_days_ago}}},
+                    {"$group": {"_id": None, "avg_risk": {"$avg": "$risk_score"}}}
+                ],
+                "types": [{"$sortByCount": "$asset_type"}],
+                # All counts in one $group, each predicate evaluated per document
+                "counts": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            **{
+                                key: {"$sum": {"$cond": [expression, 1, 0]}}
+                                for key, expression in count_expressions.items()
+                            }
+                        }
+                    }
+                ],
+            }
+        }
+    ]
+
+    # Scan totals for the 7-day comparison in one $facet pass as well
+    scan_pipeline = [
+        {"$match": {"user_id": uid}},
+        {
+            "$facet": {
+                "total_scans": [{"$count": "n"}],
+                "scans_7d_ago": [
+                    {"$match": {"created_at": {"$lt": seven_days_ago}}},
+                    {"$count": "n"}
+                ],
+                "scans_previous_7d": [
+                    {"$match": {"created_at": {"$gte": fourteen_days_ago, "$lt": seven_days_ago}}},
+                    {"$count": "n"}
+                ],
+            }
+        }
+    ]
+
+    facet_result, scan_facet_result, last_scan = await asyncio.gather(
+        assets_collection.aggregate(asset_pipeline).to_list(length=1),
+        scans_collection.aggregate(scan_pipeline).to_list(length=1),
+        # Covered by the (user_id, scan_status, completed_at) index
+        scans_collection.find_one(
+            {"user_id": uid, "scan_status": "completed"},
+            projection={"_id": 0, "completed_at": 1},
+            sort=[("completed_at", -1)]
+        ),
+    )
+
+    facets = facet_result[0] if facet_result else {}
+    risk_rows = facets.get("by_risk", [])
+    old_avg_result = facets.get("old_avg", [])
+    type_rows = facets.get("types", [])
+    count_row = facets["counts"][0] if facets.get("counts") else {}
+    counts = {key: count_row.get(key, 0) for key in count_expressions}
+    scan_facets = scan_facet_result[0] if scan_facet_result else {}
+
+    total_assets = sum(row["n"] for row in risk_rows)
+    assets_by_risk = {"low": 0, "medium": 0, "high": 0, "critical": 0}
+    for row in risk_rows:
+        level = RISK_BUCKETS.get(row["_id"])
+        if level:
+            assets_by_risk[level] = row["n"]
+
+    # Weighting each level's average by its scored assets (not all assets)
+    # matches a plain $avg, which skips unscored documents
+    scored_rows = [row for row in risk_rows if row.get("avg") is not None]
+    scored_total = sum(row["scored"] for row in scored_rows)
+    avg_risk = (
+        sum(row["avg"] * row["scored"] for row in scored_rows) / scored_total
+        if scored_total else 0
+    )
+    old_avg_risk = old_avg_result[0].get("avg_risk") if old_avg_result else None
+
+    return {
+        "user_id": uid,
+        "total_assets": total_assets,
+        "assets_by_risk": assets_by_risk,
+        "asset_types": {row["_id"]: row["count"] for row in type_rows if row["_id"]},
+        "avg_risk": avg_risk,
+        "old_avg_risk": old_avg_risk,
+        "open_vulnerabilities": assets_by_risk["high"] + assets_by_risk["critical"],
+        **counts,
+        "risk_factors": _rank_risk_factors(counts, total_assets),
+        "total_scans": _facet_count(scan_facets, "total_scans"),
+        "scans_7d_ago": _facet_count(scan_facets, "scans_7d_ago"),
+        "scans_previous_7d": _facet_count(scan_facets, "scans_previous_7d"),
+        "last_scan_at": last_scan.get("completed_at") if last_scan else None,
+        "version": SUMMARY_VERSION,
+        "updated_at": now,
+    }
+
+
+async def refresh_user_summary(uid: str) -> Dict:
+    """
+    Recompute and store the analytics summary for a user.
+
+    Args:
+        uid: User ID (Firebase UID)
+
+    Returns:
+        Freshly computed summary dict
+    """
+    summary = await compute_user_summary(uid)
+
+    await get_collection(SUMMARY_COLLECTION).update_one(
+        {"user_id": uid},
+        {"$set": summary},
+        upsert=True
+    )
+
+    # Cached analytics responses were built from the previous summary
+    invalidate_user(uid)
+
+    return summary
+
+
+async def _load_user_summary(uid: str) -> Dict:
+    """
+    Load the stored summary when fresh, otherwise recompute and store it.
+
+    Args:
+        uid: User ID (Firebase UID)
+
+    Returns:
+        Summary dict
+    """
+    summary: Optional[Dict] = await get_collection(SUMMARY_COLLECTION).find_one(
+        {"user_id": uid},
+        projection={"_id": 0}
+    )
+
+    if summary and summary.get("version") == SUMMARY_VERSION and \
+            summary["updated_at"] >= datetime.utcnow() - SUMMARY_MAX_AGE:
+        return summary
+
+    return await refresh_user_summary(uid)
+
+
+async def get_user_summary(uid: str) -> Dict:
+    """
+    Get the analytics summary for a user.
+
+    Serves the stored summary when it is fresh, otherwise falls back to
+    a live recompute which is stored for subsequent reads. The result is
+    memoized in-process so the dashboard, risk factor and insight endpoints
+    fired by one page load share a single read.
+
+    Args:
+        uid: User ID (Firebase UID)
+
+    Returns:
+        Summary dict
+    """
+    return await cached(f"{uid}:summary", SUMMARY_CACHE_TTL, lambda: _load_user_summary(uid))
+
+
+async def clear_user_summary(uid: str) -> None:
+    """
+    Drop the stored summary for a user so the next read recomputes it.
+
+    Args:
+        uid: User ID (Firebase UID)
+    """
+    await get_collection(SUMMARY_COLLECTION).delete_one({"user_id": uid})
+    invalidate_user(uid)
+
@@ -4,16 +4,43 @@ Groq LLM Service for Security Recommendations
 Provides AI-powered next step suggestions for security issues using Groq API.
 """
 
+import asyncio
+import hashlib
 import os
 import logging
 from typing import Dict, Optional, List
 from groq import Groq
 
+from app.core.cache import cached, completion_cache
+
 logger = logging.getLogger(__name__)
 
 # Initialize Groq client
 groq_client: Optional[Groq] = None
 
+# Maximum concurrent Groq requests when generating recommendations in batch
+BATCH_RECOMMENDATION_CONCURRENCY = 4
+
+# Seconds a completion is reused for an identical prompt
+COMPLETION_CACHE_TTL = 24 * 60 * 60
+
+
+def _completion_cache_key(kind: str, prompt: str) -> str:
+    """
+    Build the cache key for a completion.
+
+    Prompts are rebuilt from the findings that matter (issue types and
+    counts, not raw detector output), so equivalent findings share a key.
+
+    Args:
+        kind: Completion type, e.g. "misconfiguration"
+        prompt: Final user prompt sent to the model
+
+    Returns:
+        Cache key
+    """
+    return f"llm:{kind}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+
 
 def initialize_groq() -> None:
     """Initialize Groq client with API key from environment."""
@@ -105,7 +132,9 @@ Be practical and specific. Do not include generic advice. Format as plain text w
         
         for model in models:
             try:
-                chat_completion = groq_client.chat.completions.create(
+                # Groq client is synchronous; run it off the event loop
+                chat_completion = await asyncio.to_thread(
+                    groq_client.chat.completions.create,
                     messages=[
                         {
                             "role": "system",
@@ -154,9 +183,10 @@ async def generate_batch_recommendations(
     if not groq_client:
         return insights
     
-    # Generate recommendations for each insight
-    for insight in insights:
-        if insight.get("priority") in ["critical", "high"]:  # Only for high-priority issues
+    semaphore = asyncio.Semaphore(BATCH_RECOMMENDATION_CONCURRENCY)
+    
+    async def recommend(insight: Dict) -> None:
+        async with semaphore:
             recommendation = await generate_security_recommendations(
                 insight_type=insight.get("type", "info"),
                 title=insight.get("title", ""),
@@ -164,9 +194,15 @@ async def generate_batch_recommendations(
                 stats=insight.get("stats"),
                 asset_details=None  # Could be enhanced to pass asset details
             )
-            
-            if recommendation:
-                insight["recommendation"] = recommendation
+        
+        if recommendation:
+            insight["recommendation"] = recommendation
+    
+    # Generate recommendations for high-priority issues concurrently
+    await asyncio.gather(*(
+        recommend(insight) for insight in insights
+        if insight.get("priority") in ["critical", "high"]
+    ))
     
     return insights
 
@@ -263,49 +299,61 @@ Provide a comprehensive, actionable recommendation (3-4 sentences) for addressin
 
 Be practical, specific, and prioritize based on severity. Format as plain text without markdown."""
         
-        # Call Groq API
-        # Note: llama-3.1-70b-versatile has been decommissioned, using working alternatives
-        models = [
-            "llama-3.1-8b-instant",     # Fast and reliable (confirmed working)
-            "mixtral-8x7b-32768",       # Alternative fallback
-            "llama-3.1-70b-versatile"   # Deprecated, will skip automatically
-        ]
-        
-        chat_completion = None
-        last_error = None
-        
-        for model in models:
-            try:
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a cybersecurity expert specializing in infrastructure security, web application security, cloud security, and security misconfigurations. Provide practical, actionable, step-by-step recommendations."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    model=model,
-                    temperature=0.7,
-                    max_tokens=300,
-                    top_p=0.9
-                )
-                break
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Failed to use model {model}: {str(e)}")
-                continue
-        
-        if not chat_completion:
-            raise Exception(f"All models failed. Last error: {str(last_error)}")
-        
-        recommendation = chat_completion.choices[0].message.content.strip()
-        
-        if not recommendation or len(recommendation) == 0:
-            logger.warning(f"Generated empty recommendation for {asset_value}")
-            return None
+        async def complete() -> str:
+            # Call Groq API
+            # Note: llama-3.1-70b-versatile has been decommissioned, using working alternatives
+            models = [
+                "llama-3.1-8b-instant",     # Fast and reliable (confirmed working)
+                "mixtral-8x7b-32768",       # Alternative fallback
+                "llama-3.1-70b-versatile"   # Deprecated, will skip automatically
+            ]
+        
+            chat_completion = None
+            last_error = None
+        
+            for model in models:
+                try:
+                    # Groq client is synchronous; run it off the event loop
+                    chat_completion = await asyncio.to_thread(
+                        groq_client.chat.completions.create,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are a cybersecurity expert specializing in infrastructure security, web application security, cloud security, and security misconfigurations. Provide practical, actionable, step-by-step recommendations."
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        model=model,
+                        temperature=0.7,
+                        max_tokens=300,
+                        top_p=0.9
+                    )
+                    break
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Failed to use model {model}: {str(e)}")
+                    continue
+        
+            if not chat_completion:
+                raise Exception(f"All models failed. Last error: {str(last_error)}")
+        
+            recommendation = chat_completion.choices[0].message.content.strip()
+            
+            if not recommendation or len(recommendation) == 0:
+                # Raise rather than return so an empty result is never cached
+                raise ValueError(f"Generated empty recommendation for {asset_value}")
+            return recommendation
+        
+        # The same asset with the same findings reuses the earlier completion
+        recommendation = await cached(
+            _completion_cache_key("misconfiguration", prompt),
+            COMPLETION_CACHE_TTL,
+            complete,
+            store=completion_cache
+        )
         
         logger.info(f"Generated misconfiguration recommendation for {asset_value}: {recommendation[:100]}...")
         return recommendation
@@ -317,6 +365,47 @@ Be practical, specific, and prioritize based on severity. Format as plain text w
         return None
 
 
+# Misconfiguration counters: (counter name, category, issue list field)
+FINDING_COUNTERS = [
+    ('missing_headers', 'web_headers', 'missing_headers'),
+    ('ssl_issues', 'ssl', 'issues'),
+    ('dns_issues', 'dns', 'issues'),
+    ('exposed_buckets', 'cloud_buckets', 'buckets'),
+    ('exposed_files', 'security_files', 'sensitive_exposed'),
+    ('open_dirs', 'open_directories', 'open_directories'),
+]
+
+
+def _count_findings(assets: List[Dict]) -> Dict[str, int]:
+    """
+    Count risk levels, misconfigurations and breaches in one pass over assets.
+    
+    Args:
+        assets: List of asset dictionaries with their security findings
+    
+    Returns:
+        Dict of counters: high_risk, medium_risk, total_breaches and one
+        per FINDING_COUNTERS entry
+    """
+    counts = dict.fromkeys(['high_risk', 'medium_risk', 'total_breaches'], 0)
+    counts.update((name, 0) for name, _, _ in FINDING_COUNTERS)
+    
+    for a in assets:
+        risk_level = a.get('risk_level')
+        if risk_level in ('high', 'critical'):
+            counts['high_risk'] += 1
+        elif risk_level == 'medium':
+            counts['medium_risk'] += 1
+        
+        misc = a.get('misconfigurations') or {}
+        for name, category, field in FINDING_COUNTERS:
+            counts[name] += len((misc.get(category) or {}).get(field) or ())
+        
+        counts['total_breaches'] += a.get('breach_history_count') or 0
+    
+    return counts
+
+
 async def generate_summary_report_recommendations(
     assets: List[Dict]
 ) -> Optional[str]:
@@ -335,18 +424,19 @@ async def generate_summary_report_recommendations(
     try:
         # Calculate summary statistics
         total_assets = len(assets)
-        high_risk = len([a for a in assets if a.get('risk_level') in ['high', 'critical']])
-        medium_risk = len([a for a in assets if a.get('risk_level') == 'medium'])
+        counts = _count_findings(assets)
+        high_risk = counts['high_risk']
+        medium_risk = counts['medium_risk']
         
         # Count misconfigurations
-        missing_headers = sum([len((a.get('misconfigurations', {}).get('web_headers', {})).get('missing_headers', [])) for a in assets])
-        ssl_issues = sum([len((a.get('misconfigurations', {}).get('ssl', {})).get('issues', [])) for a in assets])
-        dns_issues = sum([len((a.get('misconfigurations', {}).get('dns', {})).get('issues', [])) for a in assets])
-        exposed_buckets = sum([len((a.get('misconfigurations', {}).get('cloud_buckets', {})).get('buckets', [])) for a in assets])
-        exposed_files = sum([len((a.get('misconfigurations', {}).get('security_files', {})).get('sensitive_exposed', [])) for a in assets])
-        open_dirs = sum([len((a.get('misconfigurations', {}).get('open_directories', {})).get('open_directories', [])) for a in assets])
+        missing_headers = counts['missing_headers']
+        ssl_issues = counts['ssl_issues']
+        dns_issues = counts['dns_issues']
+        exposed_buckets = counts['exposed_buckets']
+        exposed_files = counts['exposed_files']
+        open_dirs = counts['open_dirs']
         
-        total_breaches = sum([a.get('breach_history_count', 0) for a in assets])
+        total_breaches = counts['total_breaches']
         
         # Build context
         context_parts = [
@@ -382,45 +472,60 @@ Provide a comprehensive, strategic recommendation (4-5 sentences) for improving
 
 Be strategic, prioritize based on risk, and provide actionable guidance. Format as plain text without markdown."""
         
-        # Call Groq API
-        # Note: llama-3.1-70b-versatile has been decommissioned, using working alternatives
-        models = [
-            "llama-3.1-8b-instant",     # Fast and reliable (confirmed working)
-            "mixtral-8x7b-32768",       # Alternative fallback
-            "llama-3.1-70b-versatile"   # Deprecated, will skip automatically
-        ]
-        
-        chat_completion = None
-        last_error = None
-        
-        for model in models:
-            try:
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a Chief Information Security Officer (CISO) providing strategic security recommendations. Provide high-level, actionable guidance for improving organizational security posture."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    model=model,
-                    temperature=0.7,
-                    max_tokens=350,
-                    top_p=0.9
-                )
-                break
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Failed to use model {model}: {str(e)}")
-                continue
-        
-        if not chat_completion:
-            raise Exception(f"All models failed. Last error: {str(last_error)}")
-        
-        recommendation = chat_completion.choices[0].message.content.strip()
+        async def complete() -> str:
+            # Call Groq API
+            # Note: llama-3.1-70b-versatile has been decommissioned, using working alternatives
+            models = [
+                "llama-3.1-8b-instant",     # Fast and reliable (confirmed working)
+                "mixtral-8x7b-32768",       # Alternative fallback
+                "llama-3.1-70b-versatile"   # Deprecated, will skip automatically
+            ]
+        
+            chat_completion = None
+            last_error = None
+        
+            for model in models:
+                try:
+                    # Groq client is synchronous; run it off the event loop
+                    chat_completion = await asyncio.to_thread(
+                        groq_client.chat.completions.create,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are a Chief Information Security Officer (CISO) providing strategic security recommendations. Provide high-level, actionable guidance for improving organizational security posture."
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        model=model,
+                        temperature=0.7,
+                        max_tokens=350,
+                        top_p=0.9
+                    )
+                    break
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Failed to use model {model}: {str(e)}")
+                    continue
+        
+            if not chat_completion:
+                raise Exception(f"All models failed. Last error: {str(last_error)}")
+        
+            recommendation = chat_completion.choices[0].message.content.strip()
+            if not recommendation:
+                # Raise rather than return so an empty result is never cached
+                raise ValueError("Generated empty summary report recommendation")
+            return recommendation
+        
+        # Unchanged findings (a dashboard reload) reuse the earlier completion
+        recommendation = await cached(
+            _completion_cache_key("summary", prompt),
+            COMPLETION_CACHE_TTL,
+            complete,
+            store=completion_cache
+        )
         logger.info("Generated summary report recommendation")
         return recommendation
         
@@ -447,14 +552,15 @@ async def generate_security_terms(assets: List[Dict]) -> List[tuple]:
         security_issues = []
         
         # Count misconfigurations
-        missing_headers = sum([len((a.get('misconfigurations', {}).get('web_headers', {})).get('missing_headers', [])) for a in assets])
-        ssl_issues = sum([len((a.get('misconfigurations', {}).get('ssl', {})).get('issues', [])) for a in assets])
-        dns_issues = sum([len((a.get('misconfigurations', {}).get('dns', {})).get('issues', [])) for a in assets])
-        exposed_buckets = sum([len((a.get('misconfigurations', {}).get('cloud_buckets', {})).get('buckets', [])) for a in assets])
-        exposed_files = sum([len((a.get('misconfigurations', {}).get('security_files', {})).get('sensitive_exposed', [])) for a in assets])
-        open_dirs = sum([len((a.get('misconfigurations', {}).get('open_directories', {})).get('open_directories', [])) for a in assets])
-        total_breaches = sum([a.get('breach_history_count', 0) for a in assets])
-        high_risk_assets = len([a for a in assets if a.get('risk_level') in ['high', 'critical']])
+        counts = _count_findings(assets)
+        missing_headers = counts['missing_headers']
+        ssl_issues = counts['ssl_issues']
+        dns_issues = counts['dns_issues']
+        exposed_buckets = counts['exposed_buckets']
+        exposed_files = counts['exposed_files']
+        open_dirs = counts['open_dirs']
+        total_breaches = counts['total_breaches']
+        high_risk_assets = counts['high_risk']
         
         # Build context of what was found
         context_parts = [
@@ -488,7 +594,8 @@ async def generate_security_terms(assets: List[Dict]) -> List[tuple]:
             if asset.get('breach_history_count', 0) > 0:
                 issue_types.append('Data Breach History')
         
-        unique_issues = list(set(issue_types))
+        # Sorted so the prompt (and its cache key) is stable for the same findings
+        unique_issues = sorted(set(issue_types))
         if unique_issues:
             context_parts.append(f"\nSpecific Issues Found: {', '.join(unique_issues[:5])}")
         
@@ -515,73 +622,83 @@ Example format:
 
 Only include terms relevant to the issues found in the scan. Return ONLY valid JSON, no other text."""
         
-        # Call Groq API
-        models = [
-            "llama-3.1-8b-instant",
-            "mixtral-8x7b-32768",
-            "llama-3.1-70b-versatile"
-        ]
-        
-        chat_completion = None
-        last_error = None
+        async def complete() -> List[tuple]:
+            # Call Groq API
+            models = [
+                "llama-3.1-8b-instant",
+                "mixtral-8x7b-32768",
+                "llama-3.1-70b-versatile"
+            ]
+        
+            chat_completion = None
+            last_error = None
+        
+            for model in models:
+                try:
+                    # Groq client is synchronous; run it off the event loop
+                    chat_completion = await asyncio.to_thread(
+                        groq_client.chat.completions.create,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are a cybersecurity educator who explains technical security terms in simple, business-friendly language. Always respond with valid JSON arrays only."
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        model=model,
+                        temperature=0.7,
+                        max_tokens=400,
+                        top_p=0.9
+                    )
+                    break
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Failed to use model {model} for terms generation: {str(e)}")
+                    continue
+        
+            if not chat_completion:
+                raise Exception(f"All models failed for terms generation. Last error: {str(last_error)}")
+        
+            response_text = chat_completion.choices[0].message.content.strip()
+        
+            # Try to extract JSON from response
+            import json
+            import re
+        
+            # Remove markdown code blocks if present
+            response_text = re.sub(r'```json\s*', '', response_text)
+            response_text = re.sub(r'```\s*', '', response_text)
+            response_text = response_text.strip()
         
-        for model in models:
             try:
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a cybersecurity educator who explains technical security terms in simple, business-friendly language. Always respond with valid JSON arrays only."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    model=model,
-                    temperature=0.7,
-                    max_tokens=400,
-                    top_p=0.9
-                )
-                break
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Failed to use model {model} for terms generation: {str(e)}")
-                continue
-        
-        if not chat_completion:
-            logger.error(f"All models failed for terms generation. Last error: {str(last_error)}")
-            return []
-        
-        response_text = chat_completion.choices[0].message.content.strip()
-        
-        # Try to extract JSON from response
-        import json
-        import re
-        
-        # Remove markdown code blocks if present
-        response_text = re.sub(r'```json\s*', '', response_text)
-        response_text = re.sub(r'```\s*', '', response_text)
-        response_text = response_text.strip()
-        
-        try:
-            terms_list = json.loads(response_text)
-            if isinstance(terms_list, list) and len(terms_list) > 0:
-                # Validate format
-                valid_terms = []
-                for term_pair in terms_list:
-                    if isinstance(term_pair, list) and len(term_pair) == 2:
-                        valid_terms.append((str(term_pair[0]), str(term_pair[1])))
+                terms_list = json.loads(response_text)
+                if isinstance(terms_list, list) and len(terms_list) > 0:
+                    # Validate format
+                    valid_terms = []
+                    for term_pair in terms_list:
+                        if isinstance(term_pair, list) and len(term_pair) == 2:
+                            valid_terms.append((str(term_pair[0]), str(term_pair[1])))
                 
-                if valid_terms:
-                    logger.info(f"Generated {len(valid_terms)} security terms")
-                    return valid_terms
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON from response: {str(e)}")
-            logger.error(f"Response text: {response_text}")
-        
-        # Fallback: return empty list
-        return []
+                    if valid_terms:
+                        logger.info(f"Generated {len(valid_terms)} security terms")
+                        return valid_terms
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON from response: {str(e)}")
+                logger.error(f"Response text: {response_text}")
+        
+            # Raise rather than return so an unusable response is never cached
+            raise ValueError("No valid security terms in response")
+        
+        # Unchanged findings (a dashboard reload) reuse the earlier terms
+        return await cached(
+            _completion_cache_key("terms", prompt),
+            COMPLETION_CACHE_TTL,
+            complete,
+            store=completion_cache
+        )
         
     except Exception as e:
         logger.error(f"Failed to generate security terms: {str(e)}")
@@ -0,0 +1,217 @@
+"""
+Scan Queue
+
+Bounded in-process queue that runs asset discovery scans on a fixed pool of
+worker tasks, so a burst of scan requests cannot flood the API event loop.
+Scan records in MongoDB act as the durable job store. A worker claims a
+scan with a lease that it keeps renewing while the scan runs, so several API
+processes can share the collection: only scans whose lease has expired (their
+process died) are picked up again by another process.
+"""
+
+import os
+import socket
+import secrets
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.core.database import get_collection
+from app.tasks.scan_worker import _execute_scan_async
+
+logger = logging.getLogger(__name__)
+
+# Number of scans executed concurrently by this process
+SCAN_WORKER_CONCURRENCY = int(os.getenv("SCAN_WORKER_CONCURRENCY", "2"))
+
+# Interrupted scans older than this are marked failed instead of re-run
+SCAN_RECOVERY_WINDOW = timedelta(hours=6)
+
+# A claimed scan is considered abandoned once its lease is this old
+SCAN_LEASE_DURATION = timedelta(seconds=120)
+
+# How often a running scan renews its lease
+SCAN_HEARTBEAT_INTERVAL_SECONDS = 30
+
+# How often abandoned scans are looked for
+SCAN_RECOVERY_INTERVAL_SECONDS = 120
+
+# Identifies this process as a lease owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+
+ACTIVE_SCAN_STATUSES = ["pending", "running"]
+
+# Pending jobs: (scan_id, domain, user_id)
+_queue: Optional[asyncio.Queue] = None
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+
+    if _queue is None:
+        _queue = asyncio.Queue()
+    return _queue
+
+
+def enqueue_scan(scan_id: str, domain: str, user_id: str) -> None:
+    """
+    Queue a scan for execution by the worker pool.
+
+    Args:
+        scan_id: Scan identifier
+        domain: Domain to scan
+        user_id: User ID
+    """
+    _get_queue().put_nowait((scan_id, domain, user_id))
+
+
+def _abandoned(now: datetime) -> Dict:
+    """
+    Filter for active scans no live process holds a lease on.
+
+    Pending scans that were never claimed get one lease period of grace,
+    since the process that accepted them normally claims them itself.
+    """
+    return {
+        "scan_status": {"$in": ACTIVE_SCAN_STATUSES},
+        "$or": [
+            {"lease_expires_at": {"$lt": now}},
+            {"lease_expires_at": None, "created_at": {"$lt": now - SCAN_LEASE_DURATION}},
+        ]
+    }
+
+
+async def _claim_scan(scan_id: str, allow_unleased: bool = False) -> Optional[Dict]:
+    """
+    Atomically take (or renew) the lease on a scan for this process.
+
+    Args:
+        scan_id: Scan identifier
+        allow_unleased: Also claim a scan no process has leased yet,
+            however recently it was created
+
+    Returns:
+        The claimed scan, or None if another process holds it or it finished
+    """
+    now = datetime.utcnow()
+    query = _abandoned(now)
+    query["$or"].append({"lease_owner": WORKER_ID})
+    if allow_unleased:
+        query["$or"].append({"lease_expires_at": None})
+
+    return await get_collection("scans").find_one_and_update(
+        {"scan_id": scan_id, **query},
+        {
+            "$set": {
+                "lease_owner": WORKER_ID,
+                "lease_expires_at": now + SCAN_LEASE_DURATION,
+                "heartbeat_at": now
+            }
+        },
+        projection={"_id": 0, "scan_id": 1}
+    )
+
+
+async def _heartbeat(scan_id: str) -> None:
+    """Keep renewing this process's lease on a running scan until cancelled."""
+    scans_collection = get_collection("scans")
+
+    while True:
+        await asyncio.sleep(SCAN_HEARTBEAT_INTERVAL_SECONDS)
+        now = datetime.utcnow()
+        try:
+            result = await scans_collection.update_one(
+                {"scan_id": scan_id, "lease_owner": WORKER_ID},
+                {"$set": {"lease_expires_at": now + SCAN_LEASE_DURATION, "heartbeat_at": now}}
+            )
+            if not result.matched_count:
+                logger.warning(f"Lost lease on scan {scan_id}")
+        except Exception as e:
+            logger.error(f"Failed to renew lease on scan {scan_id}: {str(e)}")
+
+
+async def _scan_worker(worker_id: int) -> None:
+    """Run queued scans one at a time until cancelled."""
+    queue = _get_queue()
+
+    while True:
+        job: Tuple[str, str, str] = await queue.get()
+        heartbeat: Optional[asyncio.Task] = None
+        try:
+            # Scans accepted by this process are claimed here; a scan another
+            # process is already running (or that finished) is skipped
+            if not await _claim_scan(job[0], allow_unleased=True):
+                logger.info(f"Scan {job[0]} is leased elsewhere or finished, skipping")
+                continue
+
+            heartbeat = asyncio.create_task(_heartbeat(job[0]))
+            await _execute_scan_async(*job)
+        except Exception as e:
+            # _execute_scan_async records its own failures; this only guards
+            # the worker against errors while doing so
+            logger.error(f"Scan worker {worker_id} failed on {job[0]}: {str(e)}")
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            queue.task_done()
+
+
+async def _recover_interrupted_scans() -> None:
+    """Claim and re-queue scans whose owning process stopped renewing them."""
+    scans_collection = get_collection("scans")
+    now = datetime.utcnow()
+
+    stale = _abandoned(now)
+    stale["created_at"] = {"$lt": now - SCAN_RECOVERY_WINDOW}
+    result = await scans_collection.update_many(
+        stale,
+        {
+            "$set": {
+                "scan_status": "failed",
+                "error_message": "Scan was interrupted",
+                "completed_at": now
+            }
+        }
+    )
+    if result.modified_count:
+        logger.warning(f"Marked {result.modified_count} stale interrupted scans as failed")
+
+    recovered = 0
+    async for scan in scans_collection.find(
+        _abandoned(now),
+        projection={"_id": 0, "scan_id": 1, "domain": 1, "user_id": 1}
+    ).sort("created_at", 1):
+        # Another process may claim the same scan between find and claim
+        if await _claim_scan(scan["scan_id"]):
+            enqueue_scan(scan["scan_id"], scan["domain"], scan["user_id"])
+            recovered += 1
+
+    if recovered:
+        logger.info(f"Re-queued {recovered} interrupted scans")
+
+
+async def _run_recovery_loop(interval: int = SCAN_RECOVERY_INTERVAL_SECONDS) -> None:
+    """Periodically pick up scans abandoned by a process that went away."""
+    while True:
+        try:
+            await _recover_interrupted_scans()
+        except Exception as e:
+            logger.error(f"Failed to recover interrupted scans: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def start_scan_workers() -> List[asyncio.Task]:
+    """
+    Start the worker pool and the recovery of abandoned scans.
+
+    Returns:
+        Worker tasks (cancel them on shutdown)
+    """
+    return [
+        asyncio.create_task(_run_recovery_loop()),
+        *(
+            asyncio.create_task(_scan_worker(worker_id))
+            for worker_id in range(SCAN_WORKER_CONCURRENCY)
+        )
+    ]
@@ -25,6 +25,7 @@ from app.detectors import (
     OpenDirectoryDetector
 )
 from app.services.email_service import email_service
+from app.services.analytics_summary import refresh_user_summary
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +52,7 @@ async def _send_risk_alert_email(
     try:
         # Get user email from database
         users_collection = get_collection("users")
-        user = await users_collection.find_one({"uid": user_id})
+        user = await users_collection.find_one({"uid": user_id}, projection={"_id": 0, "email": 1})
         
         if not user or not user.get("email"):
             logger.warning(f"Cannot send alert: User {user_id} not found or has no email")
@@ -292,6 +293,7 @@ async def _execute_scan_async(scan_id: str, domain: str, user_id: str):
                     "user_id": user_id,
                     "workspace_id": user_id,
                     **asset_data,
+                    "asset_value_lc": asset_data["asset_value"].lower(),  # Indexed for search
                     "parent_domain": domain,
                     "discovered_at": datetime.utcnow(),
                     "last_scanned_at": datetime.utcnow(),
@@ -315,14 +317,19 @@ async def _execute_scan_async(scan_id: str, domain: str, user_id: str):
                 continue
 
         # Update scan record
+        scan_doc = await scans_collection.find_one(
+            {"scan_id": scan_id},
+            projection={"_id": 0, "started_at": 1}
+        )
+        completed_at = datetime.utcnow()
         await scans_collection.update_one(
             {"scan_id": scan_id},
             {
                 "$set": {
                     "scan_status": "completed",
-                    "completed_at": datetime.utcnow(),
+                    "completed_at": completed_at,
                     "assets_found": assets_saved,
-                    "duration_seconds": (datetime.utcnow() - (await scans_collection.find_one({"scan_id": scan_id}))["started_at"]).total_seconds()
+                    "duration_seconds": (completed_at - scan_doc["started_at"]).total_seconds()
                 }
             }
         )
@@ -344,6 +351,13 @@ async def _execute_scan_async(scan_id: str, domain: str, user_id: str):
             }
         )
 
+    # Refresh the materialized analytics summary whether the scan completed
+    # or failed part-way, since assets may have been saved either way
+    try:
+        await refresh_user_summary(user_id)
+    except Exception as e:
+        logger.error(f"Failed to refresh analytics summary for {user_id}: {str(e)}")
+
 
 def _calculate_basic_risk_score(asset: dict) -> int:
     """
@@ -0,0 +1,103 @@
+"""
+Tests for the analytics summary computation.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import analytics_summary
+from app.services.analytics_summary import (
+    RISK_FACTORS,
+    TOP_RISK_FACTORS,
+    _rank_risk_factors,
+    compute_user_summary,
+)
+
+
+def _counts(**overrides):
+    counts = {key: 0 for _, key in RISK_FACTORS}
+    counts.update(overrides)
+    return counts
+
+
+def _collection(aggregate_result, find_one_result=None):
+    collection = MagicMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=aggregate_result)
+    collection.find_one = AsyncMock(return_value=find_one_result)
+    return collection
+
+
+def test_risk_factors_are_sorted_by_count_with_percentages():
+    factors = _rank_risk_factors(_counts(ssh_count=2, db_count=5, invalid_ssl=1), 10)
+
+    assert factors == [
+        {"name": "Database Exposed", "count": 5, "percentage": 50.0},
+        {"name": "SSH Exposed", "count": 2, "percentage": 20.0},
+        {"name": "Invalid SSL", "count": 1, "percentage": 10.0},
+    ]
+
+
+def test_risk_factors_are_capped_and_empty_without_assets():
+    counts = _counts(**{key: index + 1 for index, (_, key) in enumerate(RISK_FACTORS)})
+
+    factors = _rank_risk_factors(counts, 100)
+    assert len(factors) == TOP_RISK_FACTORS
+    assert factors[0]["name"] == RISK_FACTORS[-1][0]
+
+    assert _rank_risk_factors(counts, 0) == []
+
+
+@pytest.mark.asyncio
+async def test_summary_maps_buckets_to_levels_and_weights_average(monkeypatch):
+    assets = _collection([{
+        "by_risk": [
+            {"_id": 0, "n": 4, "scored": 2, "avg": 10.0},
+            {"_id": 61, "n": 2, "scored": 2, "avg": 70.0},
+            {"_id": 86, "n": 1, "scored": 1, "avg": 90.0},
+            # Unscored assets count towards the total but not the average
+            {"_id": "other", "n": 3, "scored": 0, "avg": None},
+        ],
+        "old_avg": [{"_id": None, "avg_risk": 42.0}],
+        "types": [{"_id": "domain", "count": 6}, {"_id": None, "count": 4}],
+        "counts": [{"_id": None, "ssh_count": 3}],
+    }])
+    scans = _collection(
+        [{"total_scans": [{"n": 5}], "scans_7d_ago": [], "scans_previous_7d": [{"n": 2}]}],
+        {"completed_at": "2024-05-01"}
+    )
+    monkeypatch.setattr(
+        analytics_summary, "get_collection", {"assets": assets, "scans": scans}.__getitem__
+    )
+
+    summary = await compute_user_summary("user-1")
+
+    assert summary["total_assets"] == 10
+    assert summary["assets_by_risk"] == {"low": 4, "medium": 0, "high": 2, "critical": 1}
+    assert summary["open_vulnerabilities"] == 3
+    assert summary["avg_risk"] == pytest.approx((10 * 2 + 70 * 2 + 90) / 5)
+    assert summary["old_avg_risk"] == 42.0
+    assert summary["asset_types"] == {"domain": 6}
+    assert summary["ssh_count"] == 3
+    assert summary["risk_factors"] == [{"name": "SSH Exposed", "count": 3, "percentage": 30.0}]
+    assert summary["total_scans"] == 5
+    assert summary["scans_7d_ago"] == 0
+    assert summary["scans_previous_7d"] == 2
+    assert summary["last_scan_at"] == "2024-05-01"
+
+
+@pytest.mark.asyncio
+async def test_summary_for_user_without_data(monkeypatch):
+    assets = _collection([])
+    scans = _collection([])
+    monkeypatch.setattr(
+        analytics_summary, "get_collection", {"assets": assets, "scans": scans}.__getitem__
+    )
+
+    summary = await compute_user_summary("user-1")
+
+    assert summary["total_assets"] == 0
+    assert summary["avg_risk"] == 0
+    assert summary["old_avg_risk"] is None
+    assert summary["risk_factors"] == []
+    assert summary["last_scan_at"] is None
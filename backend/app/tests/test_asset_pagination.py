@@ -0,0 +1,63 @@
+"""
+Tests for the asset listing's keyset pagination helpers.
+"""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api.routes.assets import _decode_page_cursor, _encode_page_cursor, _keyset_conditions
+
+
+def test_cursor_round_trips_bson_types():
+    last_id = ObjectId()
+    discovered_at = datetime(2024, 5, 1, 12, 30)
+
+    assert _decode_page_cursor(_encode_page_cursor(discovered_at, last_id)) == (discovered_at, last_id)
+    assert _decode_page_cursor(_encode_page_cursor(None, last_id)) == (None, last_id)
+    assert _decode_page_cursor(_encode_page_cursor(42, last_id)) == (42, last_id)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_page_cursor("not-a-cursor")
+
+    assert exc_info.value.status_code == 400
+
+
+def test_descending_conditions_break_ties_on_id_and_include_missing_values():
+    last_id = ObjectId()
+
+    assert _keyset_conditions("risk_score", -1, 70, last_id) == [
+        {"risk_score": 70, "_id": {"$lt": last_id}},
+        {"risk_score": {"$lt": 70}},
+        {"risk_score": None},
+    ]
+
+
+def test_ascending_conditions_break_ties_on_id():
+    last_id = ObjectId()
+
+    assert _keyset_conditions("risk_score", 1, 70, last_id) == [
+        {"risk_score": 70, "_id": {"$gt": last_id}},
+        {"risk_score": {"$gt": 70}},
+    ]
+
+
+def test_ascending_from_missing_value_moves_on_to_set_values():
+    last_id = ObjectId()
+
+    assert _keyset_conditions("discovered_at", 1, None, last_id) == [
+        {"discovered_at": None, "_id": {"$gt": last_id}},
+        {"discovered_at": {"$ne": None}},
+    ]
+
+
+def test_descending_from_missing_value_stays_within_missing_values():
+    last_id = ObjectId()
+
+    assert _keyset_conditions("discovered_at", -1, None, last_id) == [
+        {"discovered_at": None, "_id": {"$lt": last_id}},
+    ]
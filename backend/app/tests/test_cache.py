@@ -0,0 +1,128 @@
+"""
+Tests for the in-process TTL cache.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import cache
+from app.core.cache import _TTLStore, cached, invalidate_user
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for store in cache._STORES:
+        for key in store.keys():
+            store.pop(key)
+    cache._locks.clear()
+    yield
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_build():
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(cached("u1:key", 60, factory) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result == {"value": 1} for result in results)
+    assert cache._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_build_is_not_cached():
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await cached("u1:key", 60, failing)
+
+    async def working():
+        return "ok"
+
+    assert await cached("u1:key", 60, working) == "ok"
+    assert cache._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_entry_expires_after_ttl(clock):
+    values = iter(["first", "second"])
+
+    async def factory():
+        return next(values)
+
+    assert await cached("u1:key", 10, factory) == "first"
+    clock[0] += 9
+    assert await cached("u1:key", 10, factory) == "first"
+    clock[0] += 2
+    assert await cached("u1:key", 10, factory) == "second"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_clears_only_that_user_in_every_store():
+    async def factory():
+        return b"data"
+
+    await cached("u1:page", 60, factory, store=cache.blob_cache)
+    await cached("u1:summary", 60, factory)
+    await cached("u2:summary", 60, factory)
+    await cached("llm:summary:abc", 60, factory, store=cache.completion_cache)
+
+    invalidate_user("u1")
+
+    assert cache.blob_cache.keys() == []
+    assert cache.response_cache.keys() == ["u2:summary"]
+    assert cache.completion_cache.keys() == ["llm:summary:abc"]
+
+
+def test_store_evicts_least_recently_used_entry():
+    store = _TTLStore(max_entries=2)
+    store.set("a", 60, 1)
+    store.set("b", 60, 2)
+    store.get("a")
+    store.set("c", 60, 3)
+
+    assert store.keys() == ["a", "c"]
+
+
+def test_store_enforces_byte_budget():
+    store = _TTLStore(max_entries=10, max_bytes=25)
+    store.set("a", 60, b"x" * 10)
+    store.set("b", 60, b"x" * 10)
+    store.set("c", 60, b"x" * 10)
+
+    assert store.keys() == ["b", "c"]
+    assert store._bytes == 20
+
+
+def test_store_skips_values_larger_than_budget():
+    store = _TTLStore(max_entries=10, max_bytes=25)
+    store.set("a", 60, b"x" * 10)
+    store.set("big", 60, b"x" * 30)
+
+    assert store.keys() == ["a"]
+    assert store._bytes == 10
+
+
+def test_store_replacing_entry_updates_byte_count():
+    store = _TTLStore(max_entries=10, max_bytes=100)
+    store.set("a", 60, b"x" * 10)
+    store.set("a", 60, b"x" * 30)
+
+    assert store._bytes == 30
+    store.pop("a")
+    assert store._bytes == 0
@@ -0,0 +1,81 @@
+"""
+Tests for the verified Firebase token cache.
+"""
+
+import time
+
+import pytest
+
+from app.core import firebase
+from app.core.firebase import TOKEN_CACHE_TTL, verify_firebase_token
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    firebase._token_cache.clear()
+    firebase._token_locks.clear()
+
+    token = {"uid": "user-1", "email": "user@example.com", "exp": time.time() + 3600}
+    calls = []
+
+    def verify_id_token(id_token, clock_skew_seconds=0):
+        calls.append(id_token)
+        return token
+
+    monkeypatch.setattr(firebase.auth, "verify_id_token", verify_id_token)
+    yield token, calls
+    firebase._token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_repeat_verification_is_served_from_cache(decoded):
+    _, calls = decoded
+
+    first = await verify_firebase_token("token-a")
+    second = await verify_firebase_token("token-a")
+
+    assert first == second
+    assert calls == ["token-a"]
+    assert firebase._token_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_cache_lifetime_is_capped_by_ttl(decoded):
+    await verify_firebase_token("token-a")
+
+    (expires_at, _), = firebase._token_cache.values()
+    assert expires_at <= time.time() + TOKEN_CACHE_TTL
+
+
+@pytest.mark.asyncio
+async def test_cache_lifetime_never_outlives_token_exp(decoded):
+    token, _ = decoded
+    token["exp"] = time.time() + 30
+
+    await verify_firebase_token("token-a")
+
+    (expires_at, _), = firebase._token_cache.values()
+    assert expires_at == token["exp"]
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_verified_again(decoded):
+    token, calls = decoded
+    token["exp"] = time.time() - 1
+
+    await verify_firebase_token("token-a")
+    await verify_firebase_token("token-a")
+
+    assert calls == ["token-a", "token-a"]
+
+
+@pytest.mark.asyncio
+async def test_callers_get_independent_copies(decoded):
+    first = await verify_firebase_token("token-a")
+    first["uid"] = "tampered"
+    second = await verify_firebase_token("token-a")
+    second["email"] = "tampered"
+    third = await verify_firebase_token("token-a")
+
+    assert third["uid"] == "user-1"
+    assert third["email"] == "user@example.com"
@@ -0,0 +1,102 @@
+"""
+Tests for scan credit reservation in the start scan endpoint.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import assets
+from app.api.routes.assets import ScanRequest, start_asset_scan
+
+
+def _request(uid="user-1"):
+    return SimpleNamespace(state=SimpleNamespace(user={"uid": uid}))
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    users = MagicMock()
+    users.find_one_and_update = AsyncMock(return_value={"plan": "free"})
+    users.find_one = AsyncMock(return_value=None)
+    users.update_one = AsyncMock()
+    scans = MagicMock()
+    scans.insert_one = AsyncMock()
+    enqueue = MagicMock()
+
+    monkeypatch.setattr(assets, "get_collection", {"users": users, "scans": scans}.__getitem__)
+    monkeypatch.setattr(assets, "enqueue_scan", enqueue)
+    return SimpleNamespace(users=users, scans=scans, enqueue=enqueue)
+
+
+@pytest.mark.asyncio
+async def test_reserved_credit_queues_scan(collections):
+    response = await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    scan_id = response["data"]["scan_id"]
+    collections.enqueue.assert_called_once_with(scan_id, "example.com", "user-1")
+    inserted = collections.scans.insert_one.await_args.args[0]
+    assert inserted["scan_id"] == scan_id
+    assert inserted["scan_status"] == "pending"
+    collections.users.update_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reservation_filter_only_matches_free_users_under_limit(collections):
+    await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    query = collections.users.find_one_and_update.await_args.args[0]
+    assert query["uid"] == "user-1"
+    assert query["$or"][0] == {"plan": {"$nin": [None, "free"]}}
+    assert "$lt" in query["$or"][1]["$expr"]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_credits_return_402(collections):
+    collections.users.find_one_and_update.return_value = None
+    collections.users.find_one.return_value = {"scan_credits_limit": 3}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    assert exc_info.value.status_code == 402
+    collections.scans.insert_one.assert_not_awaited()
+    collections.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_returns_404(collections):
+    collections.users.find_one_and_update.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_refunds_free_credit(collections):
+    collections.scans.insert_one.side_effect = RuntimeError("write failed")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    assert exc_info.value.status_code == 500
+    collections.users.update_one.assert_awaited_once_with(
+        {"uid": "user-1"},
+        {"$inc": {"scan_credits_used": -1}}
+    )
+    collections.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_does_not_refund_paid_plan(collections):
+    collections.users.find_one_and_update.return_value = {"plan": "pro"}
+    collections.scans.insert_one.side_effect = RuntimeError("write failed")
+
+    with pytest.raises(HTTPException):
+        await start_asset_scan(_request(), ScanRequest(domain="example.com"))
+
+    collections.users.update_one.assert_not_awaited()
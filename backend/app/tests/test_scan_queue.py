@@ -0,0 +1,173 @@
+"""
+Tests for scan leases and recovery in the scan queue.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.tasks import scan_queue
+from app.tasks.scan_queue import SCAN_LEASE_DURATION, SCAN_RECOVERY_WINDOW, WORKER_ID
+
+
+class _Cursor:
+    """Minimal async cursor over a list of documents."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    collection = MagicMock()
+    collection.find_one_and_update = AsyncMock(return_value={"scan_id": "scn_1"})
+    collection.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    collection.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
+    collection.find = MagicMock(return_value=_Cursor([]))
+
+    monkeypatch.setattr(scan_queue, "get_collection", lambda name: collection)
+    monkeypatch.setattr(scan_queue, "_queue", asyncio.Queue())
+    return collection
+
+
+def test_abandoned_matches_expired_leases_and_old_unleased_scans():
+    now = datetime(2024, 5, 1, 12, 0)
+
+    assert scan_queue._abandoned(now) == {
+        "scan_status": {"$in": ["pending", "running"]},
+        "$or": [
+            {"lease_expires_at": {"$lt": now}},
+            {"lease_expires_at": None, "created_at": {"$lt": now - SCAN_LEASE_DURATION}},
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_claim_sets_lease_for_this_worker(scans):
+    assert await scan_queue._claim_scan("scn_1") == {"scan_id": "scn_1"}
+
+    query, update = scans.find_one_and_update.await_args.args
+    assert query["scan_id"] == "scn_1"
+    assert {"lease_owner": WORKER_ID} in query["$or"]
+    assert {"lease_expires_at": None} not in query["$or"]
+
+    lease = update["$set"]
+    assert lease["lease_owner"] == WORKER_ID
+    assert lease["lease_expires_at"] - lease["heartbeat_at"] == SCAN_LEASE_DURATION
+
+
+@pytest.mark.asyncio
+async def test_claim_of_new_scan_accepts_unleased_records(scans):
+    await scan_queue._claim_scan("scn_1", allow_unleased=True)
+
+    query = scans.find_one_and_update.await_args.args[0]
+    assert {"lease_expires_at": None} in query["$or"]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_only_own_lease(scans, monkeypatch):
+    monkeypatch.setattr(scan_queue, "SCAN_HEARTBEAT_INTERVAL_SECONDS", 0)
+
+    task = asyncio.create_task(scan_queue._heartbeat("scn_1"))
+    while scans.update_one.await_count < 2:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    query, update = scans.update_one.await_args.args
+    assert query == {"scan_id": "scn_1", "lease_owner": WORKER_ID}
+    assert update["$set"]["lease_expires_at"] - update["$set"]["heartbeat_at"] == SCAN_LEASE_DURATION
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_survives_database_errors(scans, monkeypatch):
+    monkeypatch.setattr(scan_queue, "SCAN_HEARTBEAT_INTERVAL_SECONDS", 0)
+    scans.update_one.side_effect = RuntimeError("connection reset")
+
+    task = asyncio.create_task(scan_queue._heartbeat("scn_1"))
+    while scans.update_one.await_count < 2:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_recovery_fails_stale_scans_and_requeues_claimed_ones(scans):
+    scans.find.return_value = _Cursor([
+        {"scan_id": "scn_1", "domain": "a.example", "user_id": "u1"},
+        {"scan_id": "scn_2", "domain": "b.example", "user_id": "u2"},
+    ])
+    # scn_2 is claimed by another process between find and claim
+    scans.find_one_and_update.side_effect = [{"scan_id": "scn_1"}, None]
+
+    await scan_queue._recover_interrupted_scans()
+
+    stale_query, stale_update = scans.update_many.await_args.args
+    now = stale_update["$set"]["completed_at"]
+    assert stale_query["created_at"] == {"$lt": now - SCAN_RECOVERY_WINDOW}
+    assert stale_update["$set"]["scan_status"] == "failed"
+
+    queue = scan_queue._get_queue()
+    assert queue.qsize() == 1
+    assert queue.get_nowait() == ("scn_1", "a.example", "u1")
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_scan_leased_elsewhere(scans, monkeypatch):
+    execute = AsyncMock()
+    monkeypatch.setattr(scan_queue, "_execute_scan_async", execute)
+    scans.find_one_and_update.return_value = None
+
+    scan_queue.enqueue_scan("scn_1", "a.example", "u1")
+    worker = asyncio.create_task(scan_queue._scan_worker(0))
+    await asyncio.wait_for(scan_queue._get_queue().join(), timeout=1)
+    worker.cancel()
+
+    execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_claimed_scan_and_stops_heartbeat(scans, monkeypatch):
+    heartbeats = []
+    heartbeat_started = asyncio.Event()
+
+    async def heartbeat(scan_id):
+        heartbeats.append(asyncio.current_task())
+        heartbeat_started.set()
+        await asyncio.Event().wait()
+
+    async def run_scan(*job):
+        # The scan runs while its lease is being renewed
+        await heartbeat_started.wait()
+
+    execute = AsyncMock(side_effect=run_scan)
+    monkeypatch.setattr(scan_queue, "_execute_scan_async", execute)
+    monkeypatch.setattr(scan_queue, "_heartbeat", heartbeat)
+
+    scan_queue.enqueue_scan("scn_1", "a.example", "u1")
+    worker = asyncio.create_task(scan_queue._scan_worker(0))
+    await asyncio.wait_for(scan_queue._get_queue().join(), timeout=1)
+    await asyncio.sleep(0)
+    worker.cancel()
+
+    execute.assert_awaited_once_with("scn_1", "a.example", "u1")
+    assert len(heartbeats) == 1
+    assert heartbeats[0].cancelled()
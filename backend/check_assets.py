@@ -13,8 +13,9 @@ async def check_assets():
     assets = get_collection("assets")
     scans = get_collection("scans")
     
-    asset_count = await assets.count_documents({})
-    scan_count = await scans.count_documents({})
+    # Whole-collection totals come from collection metadata, no scan needed
+    asset_count = await assets.estimated_document_count()
+    scan_count = await scans.estimated_document_count()
     
     print(f"\n=== Database Status ===")
     print(f"Total Assets: {asset_count}")
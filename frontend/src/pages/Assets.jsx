@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import api from '../services/api';
 import Card from '../components/ui/Card';
@@ -24,6 +24,7 @@ const Assets = () => {
   const [loadingSummaryRecommendation, setLoadingSummaryRecommendation] = useState(false);
   const [securityTerms, setSecurityTerms] = useState([]);
   const [loadingSecurityTerms, setLoadingSecurityTerms] = useState(false);
+  const assetsFingerprint = useRef(null);
 
   useEffect(() => {
     fetchAssets();
@@ -52,6 +53,14 @@ const Assets = () => {
       const response = await api.get(`/api/assets/?page=${currentPage}&search=${searchTerm}`);
       const assetsData = response.data.data || response.data;
       const fetchedAssets = assetsData.assets || [];
+
+      // Unchanged page (e.g. an auto-refresh between scans): keep the current
+      // state so the table is not re-rendered
+      if (assetsData.fingerprint && assetsData.fingerprint === assetsFingerprint.current) {
+        return;
+      }
+      assetsFingerprint.current = assetsData.fingerprint || null;
+
       setAssets(fetchedAssets);
       setTotalPages(assetsData.pagination?.total_pages || assetsData.total_pages || 1);
       
@@ -247,6 +256,7 @@ const Assets = () => {
             type: 'success',
             message: `Scan completed! Found ${domainAssets.length} asset(s) for "${scanDomain}".`
           });
+          assetsFingerprint.current = null;
           setAssets(currentAssets);
           setTotalPages(assetsData.pagination?.total_pages || assetsData.total_pages || 1);
           break;